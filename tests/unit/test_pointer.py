@@ -7,6 +7,10 @@ from tx2tx.common.settings import settings
 from tx2tx.common.types import Direction, Position, Screen
 from tx2tx.x11.pointer import PointerTracker
 
+_SEC: int = 1_000_000_000
+# Edge contact age that has just passed the configured dwell
+_DWELL_ELAPSED_NS: int = int((settings.EDGE_DWELL_SECONDS + 0.01) * _SEC)
+
 
 class TestPointerTrackerVelocityCalculation:
     """Test velocity calculation logic"""
@@ -30,27 +34,27 @@ class TestPointerTrackerVelocityCalculation:
         assert velocity == 0.0
 
         # Add one position (still insufficient, needs 2+)
-        tracker._position_history.append((Position(x=100, y=100), time.time()))
+        tracker._sample_record(100, 100, time.monotonic_ns())
         velocity = tracker.velocity_calculate()
         assert velocity == 0.0
 
     def test_velocity_calculate_zero_time_delta(self, tracker):
         """Test velocity calculation with zero time delta returns 0"""
-        same_time = time.time()
-        tracker._position_history.append((Position(x=100, y=100), same_time))
-        tracker._position_history.append((Position(x=200, y=200), same_time))
+        same_time = time.monotonic_ns()
+        tracker._sample_record(100, 100, same_time)
+        tracker._sample_record(200, 200, same_time)
 
         velocity = tracker.velocity_calculate()
         assert velocity == 0.0
 
     def test_velocity_calculate_manhattan_distance(self, tracker):
         """Test velocity calculation uses Manhattan distance"""
-        start_time = time.time()
-        end_time = start_time + 1.0  # 1 second elapsed
+        start_time = time.monotonic_ns()
+        end_time = start_time + _SEC  # 1 second elapsed
 
         # Move 100 pixels right, 50 pixels down in 1 second
-        tracker._position_history.append((Position(x=0, y=0), start_time))
-        tracker._position_history.append((Position(x=100, y=50), end_time))
+        tracker._sample_record(0, 0, start_time)
+        tracker._sample_record(100, 50, end_time)
 
         velocity = tracker.velocity_calculate()
 
@@ -60,11 +64,11 @@ class TestPointerTrackerVelocityCalculation:
 
     def test_velocity_calculate_fast_movement(self, tracker):
         """Test velocity calculation for fast pointer movement"""
-        start_time = time.time()
+        start_time = time.monotonic_ns()
 
         # Simulate fast horizontal movement: 500 pixels in 0.5 seconds
-        tracker._position_history.append((Position(x=0, y=100), start_time))
-        tracker._position_history.append((Position(x=500, y=100), start_time + 0.5))
+        tracker._sample_record(0, 100, start_time)
+        tracker._sample_record(500, 100, start_time + int(0.5 * _SEC))
 
         velocity = tracker.velocity_calculate()
 
@@ -74,11 +78,11 @@ class TestPointerTrackerVelocityCalculation:
 
     def test_velocity_calculate_slow_movement(self, tracker):
         """Test velocity calculation for slow pointer movement"""
-        start_time = time.time()
+        start_time = time.monotonic_ns()
 
         # Simulate slow movement: 50 pixels in 1 second
-        tracker._position_history.append((Position(x=100, y=100), start_time))
-        tracker._position_history.append((Position(x=125, y=125), start_time + 1.0))
+        tracker._sample_record(100, 100, start_time)
+        tracker._sample_record(125, 125, start_time + _SEC)
 
         velocity = tracker.velocity_calculate()
 
@@ -87,23 +91,62 @@ class TestPointerTrackerVelocityCalculation:
         assert velocity == 50.0
 
     def test_velocity_calculate_multi_sample_history(self, tracker):
-        """Test velocity calculation uses oldest and newest samples"""
-        start_time = time.time()
+        """Test velocity calculation across a steady multi-sample window"""
+        start_time = time.monotonic_ns()
 
-        # Add multiple samples - velocity should be based on oldest to newest
-        tracker._position_history.append((Position(x=0, y=0), start_time))
-        tracker._position_history.append((Position(x=50, y=0), start_time + 0.25))
-        tracker._position_history.append((Position(x=100, y=0), start_time + 0.5))
-        tracker._position_history.append((Position(x=150, y=0), start_time + 0.75))
-        tracker._position_history.append((Position(x=200, y=0), start_time + 1.0))
+        # Add multiple samples at a constant speed
+        tracker._sample_record(0, 0, start_time)
+        tracker._sample_record(50, 0, start_time + int(0.25 * _SEC))
+        tracker._sample_record(100, 0, start_time + int(0.5 * _SEC))
+        tracker._sample_record(150, 0, start_time + int(0.75 * _SEC))
+        tracker._sample_record(200, 0, start_time + _SEC)
 
         velocity = tracker.velocity_calculate()
 
-        # Should compare first (0,0) to last (200,0) over 1.0 second
-        # Manhattan distance = 200, time = 1.0s
+        # Every step is 50 px in 0.25s
         # Velocity = 200 px/s
         assert velocity == 200.0
 
+    def test_velocity_calculate_ignores_single_jump(self, tracker):
+        """Test one jumped sample does not dominate the velocity estimate"""
+        start_time = time.monotonic_ns()
+
+        tracker._sample_record(0, 0, start_time)
+        tracker._sample_record(10, 0, start_time + int(0.1 * _SEC))
+        tracker._sample_record(800, 0, start_time + int(0.2 * _SEC))
+        tracker._sample_record(810, 0, start_time + int(0.3 * _SEC))
+
+        velocity = tracker.velocity_calculate()
+
+        # Steps are 100, 7900 and 100 px/s; the median ignores the jump
+        assert velocity == pytest.approx(100.0)
+
+    def test_velocity_calculate_drops_samples_beyond_history_size(self, tracker):
+        """Test the oldest sample is overwritten once the history is full"""
+        start_time = time.monotonic_ns()
+
+        # A stationary sample followed by a full window of steady motion
+        tracker._sample_record(0, 0, start_time)
+        for step in range(1, settings.POSITION_HISTORY_SIZE + 1):
+            tracker._sample_record(1000 + 10 * step, 0, start_time + step * _SEC)
+
+        velocity = tracker.velocity_calculate()
+
+        assert velocity == 10.0
+
+    def test_velocity_calculate_ignores_leg_across_reset(self, tracker):
+        """Test the first sample after reset is not measured against stale history"""
+        start_time = time.monotonic_ns()
+
+        tracker._sample_record(0, 0, start_time)
+        tracker.reset()
+        tracker._sample_record(5000, 0, start_time + _SEC)
+        tracker._sample_record(5010, 0, start_time + 2 * _SEC)
+
+        velocity = tracker.velocity_calculate()
+
+        assert velocity == 10.0
+
 
 class TestPointerTrackerBoundaryDetection:
     """Test boundary detection logic"""
@@ -128,16 +171,16 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_left_edge_with_velocity(self, tracker, screen):
         """Test detection at left edge after edge confirmation+dwell."""
         # Setup velocity history (fast leftward movement)
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.09))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(0, 500, start_time + int(0.09 * _SEC))
+        tracker._sample_record(0, 500, start_time + int(0.1 * _SEC))
 
         # Current position at strict left edge
         position = Position(x=0, y=500)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -147,16 +190,16 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_right_edge_with_velocity(self, tracker, screen):
         """Test detection at right edge after edge confirmation+dwell."""
         # Setup velocity history (fast rightward movement)
-        start_time = time.time()
-        tracker._position_history.append((Position(x=1700, y=500), start_time))
-        tracker._position_history.append((Position(x=1919, y=500), start_time + 0.09))
-        tracker._position_history.append((Position(x=1919, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(1700, 500, start_time)
+        tracker._sample_record(1919, 500, start_time + int(0.09 * _SEC))
+        tracker._sample_record(1919, 500, start_time + int(0.1 * _SEC))
 
         # Current position at strict right edge (width - 1)
         position = Position(x=1919, y=500)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -166,15 +209,15 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_top_edge_with_velocity(self, tracker, screen):
         """Test detection at top edge after edge confirmation+dwell."""
         # Setup velocity history (fast upward movement)
-        start_time = time.time()
-        tracker._position_history.append((Position(x=960, y=200), start_time))
-        tracker._position_history.append((Position(x=960, y=0), start_time + 0.09))
-        tracker._position_history.append((Position(x=960, y=0), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(960, 200, start_time)
+        tracker._sample_record(960, 0, start_time + int(0.09 * _SEC))
+        tracker._sample_record(960, 0, start_time + int(0.1 * _SEC))
 
         position = Position(x=960, y=0)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -184,16 +227,16 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_bottom_edge_with_velocity(self, tracker, screen):
         """Test detection at bottom edge after edge confirmation+dwell."""
         # Setup velocity history (fast downward movement)
-        start_time = time.time()
-        tracker._position_history.append((Position(x=960, y=900), start_time))
-        tracker._position_history.append((Position(x=960, y=1079), start_time + 0.09))
-        tracker._position_history.append((Position(x=960, y=1079), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(960, 900, start_time)
+        tracker._sample_record(960, 1079, start_time + int(0.09 * _SEC))
+        tracker._sample_record(960, 1079, start_time + int(0.1 * _SEC))
 
         # Bottom edge: y == height - 1
         position = Position(x=960, y=1079)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -203,15 +246,15 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_at_edge_insufficient_velocity(self, tracker, screen):
         """Test edge transition does not depend on velocity anymore."""
         # Setup slow movement (velocity < 100 px/s)
-        start_time = time.time()
-        tracker._position_history.append((Position(x=50, y=500), start_time))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 1.0))  # Only 50 px/s
+        start_time = time.monotonic_ns()
+        tracker._sample_record(50, 500, start_time)
+        tracker._sample_record(0, 500, start_time + _SEC)  # Only 50 px/s
 
         # At left edge with slow movement still transitions after dwell.
         position = Position(x=0, y=500)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
         assert transition is not None
         assert transition.direction == Direction.LEFT
@@ -219,9 +262,9 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_center_screen_with_velocity(self, tracker, screen):
         """Test no transition in center of screen even with velocity"""
         # Setup fast movement
-        start_time = time.time()
-        tracker._position_history.append((Position(x=800, y=500), start_time))
-        tracker._position_history.append((Position(x=960, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(800, 500, start_time)
+        tracker._sample_record(960, 500, start_time + int(0.1 * _SEC))
 
         # Fast movement but not at boundary
         position = Position(x=960, y=500)
@@ -232,9 +275,9 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_exactly_at_threshold(self, tracker, screen):
         """Test no detection at threshold distance when not at strict edge"""
         # Setup velocity history
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=5, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(5, 500, start_time + int(0.1 * _SEC))
 
         # x=5 is not strict edge in strict-edge mode
         position = Position(x=5, y=500)
@@ -245,9 +288,9 @@ class TestPointerTrackerBoundaryDetection:
     def test_boundary_detect_just_inside_threshold(self, tracker, screen):
         """Test no detection just inside boundary threshold"""
         # Setup velocity history
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=6, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(6, 500, start_time + int(0.1 * _SEC))
 
         # x=6 is just outside the left edge threshold (> 5)
         position = Position(x=6, y=500)
@@ -257,24 +300,24 @@ class TestPointerTrackerBoundaryDetection:
 
     def test_boundary_detect_requires_two_consecutive_edge_samples(self, tracker, screen):
         """Test edge transition requires confirmation sample."""
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(0, 500, start_time + int(0.1 * _SEC))
 
         first_transition = tracker.boundary_detect(Position(x=0, y=500), screen)
         assert first_transition is None
 
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.12))
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._sample_record(0, 500, start_time + int(0.12 * _SEC))
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         second_transition = tracker.boundary_detect(Position(x=0, y=500), screen)
         assert second_transition is not None
         assert second_transition.direction == Direction.LEFT
 
     def test_boundary_detect_requires_edge_dwell_time(self, tracker, screen):
         """Test edge transition requires configured continuous dwell duration."""
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(0, 500, start_time + int(0.1 * _SEC))
 
         first_transition = tracker.boundary_detect(Position(x=0, y=500), screen)
         assert first_transition is None
@@ -283,6 +326,87 @@ class TestPointerTrackerBoundaryDetection:
         second_transition = tracker.boundary_detect(Position(x=0, y=500), screen)
         assert second_transition is None
 
+    def test_boundary_detect_matches_direction_rules(self, tracker, screen):
+        """Test cached edge lookup agrees with the per-position direction rules."""
+        coordinates_x = (-5, 0, 1, 960, 1918, 1919, 1925)
+        coordinates_y = (-5, 0, 1, 540, 1078, 1079, 1085)
+        for x in coordinates_x:
+            for y in coordinates_y:
+                position = Position(x=x, y=y)
+                tracker._edgeContact_reset()
+                tracker.boundary_detect(position, screen)
+                assert tracker._edge_contact_direction == (
+                    PointerTracker.boundaryDirectionFromPosition_get(position, screen)
+                )
+
+
+class TestPointerTrackerHistorySampling:
+    """Test edge-weighted history sampling in position_query"""
+
+    @pytest.fixture
+    def tracker(self):
+        """Create tracker bound to a 1920x1080 geometry"""
+        tracker = PointerTracker(display_manager=Mock(), edge_threshold=5)
+        tracker.geometry_set(Screen(width=1920, height=1080))
+        return tracker
+
+    def test_interior_samples_are_strided(self, tracker):
+        """Test only every Nth sample is recorded away from the edges"""
+        tracker._display_manager.pointerPosition_get.return_value = Position(x=960, y=540)
+        stride = settings.POSITION_HISTORY_INTERIOR_STRIDE
+
+        for _ in range(stride * 2):
+            tracker.position_query()
+
+        assert tracker._history_count == 2
+        assert tracker.positionLast_get() == Position(x=960, y=540)
+
+    def test_edge_zone_samples_are_all_recorded(self, tracker):
+        """Test every sample near an edge is recorded"""
+        tracker._display_manager.pointerPosition_get.return_value = Position(x=10, y=540)
+
+        for _ in range(3):
+            tracker.position_query()
+
+        assert tracker._history_count == 3
+
+    def test_untracked_velocity_records_no_samples(self):
+        """Test a tracker without velocity consumers skips history and tick"""
+        tracker = PointerTracker(display_manager=Mock(), track_velocity=False)
+        tracker._display_manager.pointerPosition_get.return_value = Position(x=10, y=540)
+
+        tracker.tick(1_000 * _SEC)
+        for _ in range(3):
+            tracker.position_query()
+
+        assert tracker._history_count == 0
+        assert tracker._now_ns == 0
+        assert tracker.velocity_calculate() == 0.0
+        assert tracker.positionLast_get() == Position(x=10, y=540)
+
+
+class TestPointerTrackerTick:
+    """Test per-iteration clock stamping"""
+
+    def test_tick_time_used_for_samples_and_dwell(self):
+        """Test samples and edge dwell read the ticked time, not the clock"""
+        tracker = PointerTracker(display_manager=Mock())
+        tracker._display_manager.pointerPosition_get.return_value = Position(x=0, y=500)
+        screen = Screen(width=1920, height=1080)
+        dwell_ns = int(settings.EDGE_DWELL_SECONDS * _SEC)
+
+        tracker.tick(1_000 * _SEC)
+        tracker.boundary_detect(tracker.position_query(), screen)
+        tracker.tick(1_000 * _SEC + dwell_ns // 2)
+        assert tracker.boundary_detect(tracker.position_query(), screen) is None
+
+        tracker.tick(1_000 * _SEC + dwell_ns + 1)
+        transition = tracker.boundary_detect(tracker.position_query(), screen)
+
+        assert transition is not None
+        assert transition.direction == Direction.LEFT
+        assert tracker._history_ns[0] == 1_000 * _SEC
+
 
 class TestPointerTrackerEdgeCases:
     """Test edge cases and special scenarios"""
@@ -319,16 +443,16 @@ class TestPointerTrackerEdgeCases:
         screen = Screen(width=1920, height=1080)
 
         # Setup velocity
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=500), start_time))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.09))
-        tracker._position_history.append((Position(x=0, y=500), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 500, start_time)
+        tracker._sample_record(0, 500, start_time + int(0.09 * _SEC))
+        tracker._sample_record(0, 500, start_time + int(0.1 * _SEC))
 
         # Should detect at x=0 after confirmation+dwell
         position = Position(x=0, y=500)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -349,16 +473,16 @@ class TestPointerTrackerEdgeCases:
         screen = Screen(width=1920, height=1080)
 
         # Setup velocity
-        start_time = time.time()
-        tracker._position_history.append((Position(x=200, y=200), start_time))
-        tracker._position_history.append((Position(x=0, y=0), start_time + 0.09))
-        tracker._position_history.append((Position(x=0, y=0), start_time + 0.1))
+        start_time = time.monotonic_ns()
+        tracker._sample_record(200, 200, start_time)
+        tracker._sample_record(0, 0, start_time + int(0.09 * _SEC))
+        tracker._sample_record(0, 0, start_time + int(0.1 * _SEC))
 
         # Top-left corner - should detect LEFT (checked before TOP) after dwell.
         position = Position(x=0, y=0)
         first_transition = tracker.boundary_detect(position, screen)
         assert first_transition is None
-        tracker._edge_contact_started_at = time.time() - settings.EDGE_DWELL_SECONDS - 0.01
+        tracker._edge_contact_started_ns = time.monotonic_ns() - _DWELL_ELAPSED_NS
         transition = tracker.boundary_detect(position, screen)
 
         assert transition is not None
@@ -0,0 +1,554 @@
+"""Unit tests for X11 DisplayManager request behavior."""
+
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from Xlib import X
+
+from tx2tx.common.types import Position
+from tx2tx.x11 import display as display_module
+from tx2tx.x11 import wire
+from tx2tx.x11.display import DisplayManager
+
+
+class _FakeRoot:
+    """Fake X11 root window recording pointer requests."""
+
+    def __init__(self, replies: list[tuple[int, int]]) -> None:
+        """Initialize fake root with scripted query_pointer replies."""
+        self._replies: list[tuple[int, int]] = replies
+        self.query_calls: int = 0
+        self.id: int = 1
+
+    def query_pointer(self) -> SimpleNamespace:
+        """Return the next scripted pointer position."""
+        index: int = min(self.query_calls, len(self._replies) - 1)
+        self.query_calls += 1
+        root_x, root_y = self._replies[index]
+        return SimpleNamespace(root_x=root_x, root_y=root_y, child=0)
+
+
+class _FakeProtocolDisplay:
+    """Fake python-xlib protocol display recording queued raw requests."""
+
+    def __init__(self) -> None:
+        """Initialize empty request log and event queue."""
+        self.requests: list[bytes] = []
+        self.event_queue: list[SimpleNamespace] = []
+        self.request_serial: int = 1
+
+    def send_request(self, request: Any, _wait_for_response: bool) -> None:
+        """Record the encoded request."""
+        self.requests.append(request._binary)
+        self.request_serial += 1
+
+    def warps_get(self) -> list[tuple[int, int]]:
+        """Decode destinations of queued WarpPointer requests."""
+        return [
+            wire.WARP_POINTER_DEST.unpack_from(binary, 20)
+            for binary in self.requests
+            if binary[0] == wire.WARP_POINTER_OPCODE
+        ]
+
+
+class _FakeDisplay:
+    """Fake python-xlib display counting round-trips."""
+
+    def __init__(self, root: _FakeRoot) -> None:
+        """Initialize fake display state."""
+        self._root: _FakeRoot = root
+        self.display: _FakeProtocolDisplay = _FakeProtocolDisplay()
+        self.sync_calls: int = 0
+        self.flush_calls: int = 0
+        self.ungrab_calls: int = 0
+
+    def screen(self) -> SimpleNamespace:
+        """Return fake screen with fake root."""
+        return SimpleNamespace(root=self._root, width_in_pixels=1920, height_in_pixels=1080)
+
+    def sync(self) -> None:
+        """Record sync calls."""
+        self.sync_calls += 1
+
+    def flush(self) -> None:
+        """Record flush calls."""
+        self.flush_calls += 1
+
+    def fileno(self) -> int:
+        """Return a placeholder connection descriptor."""
+        return 99
+
+    def ungrab_pointer(self, _time: int) -> None:
+        """Record pointer ungrab requests."""
+        self.ungrab_calls += 1
+
+    def pending_events(self) -> int:
+        """Return the number of queued events."""
+        return len(self.display.event_queue)
+
+    def next_event(self) -> SimpleNamespace:
+        """Pop the oldest queued event."""
+        return self.display.event_queue.pop(0)
+
+
+class _FakeXcbChannel:
+    """Fake libxcb companion channel recording pointer requests."""
+
+    def __init__(self) -> None:
+        """Initialize fake channel state."""
+        self.has_xtest: bool = True
+        self.motions: list[tuple[int, int]] = []
+        self.warps: list[tuple[int, int]] = []
+        self.flush_calls: int = 0
+        self.poll_calls: int = 0
+
+    def pointer_motionFake(self, x: int, y: int) -> None:
+        """Record XTest motion."""
+        self.motions.append((x, y))
+
+    def pointer_warp(self, x: int, y: int) -> None:
+        """Record warp."""
+        self.warps.append((x, y))
+
+    def flush(self) -> None:
+        """Record flush call."""
+        self.flush_calls += 1
+
+    def errors_poll(self) -> int:
+        """Record error poll."""
+        self.poll_calls += 1
+        return 0
+
+
+def _displayManager_build(display: Any) -> DisplayManager:
+    """Build a DisplayManager bound to a fake display without connecting."""
+    manager: DisplayManager = DisplayManager(x11native=True)
+    manager._display = display
+    manager._screen = display.screen()
+    manager._root = manager._screen.root
+    manager._has_xtest = True
+    manager._warp_prefix = wire.warpPointerPrefix_pack(manager._root.id)
+    manager._xtest_opcode = 132
+    return manager
+
+
+class TestCursorPositionSetAndVerify:
+    """Tests for warp verification round-trip behavior."""
+
+    def test_verify_succeeds_with_single_query(self, monkeypatch) -> None:
+        """A matching first reply should not trigger any retry."""
+        root = _FakeRoot(replies=[(100, 200)])
+        manager = _displayManager_build(_FakeDisplay(root))
+        monkeypatch.setattr(manager, "cursorPosition_set", lambda _position: None)
+
+        assert manager.cursorPosition_setAndVerify(Position(x=100, y=200)) is True
+        assert root.query_calls == 1
+
+    def test_verify_requeries_once_after_wait_timeout(self, monkeypatch) -> None:
+        """A mismatched pointer should be re-queried once after an idle wait."""
+        root = _FakeRoot(replies=[(0, 0)])
+        manager = _displayManager_build(_FakeDisplay(root))
+        monkeypatch.setattr(manager, "cursorPosition_set", lambda _position: None)
+        manager._has_xtest = False
+        monkeypatch.setattr(
+            "tx2tx.x11.display.select.select", lambda _r, _w, _x, _timeout: ([], [], [])
+        )
+
+        assert manager.cursorPosition_setAndVerify(Position(x=100, y=200)) is False
+        assert root.query_calls == 2
+
+    def test_verify_succeeds_after_server_wakeup(self, monkeypatch) -> None:
+        """Incoming server data should trigger a re-query that can succeed."""
+        root = _FakeRoot(replies=[(0, 0), (100, 200)])
+        manager = _displayManager_build(_FakeDisplay(root))
+        monkeypatch.setattr(manager, "cursorPosition_set", lambda _position: None)
+        manager._has_xtest = False
+        monkeypatch.setattr(
+            "tx2tx.x11.display.select.select", lambda r, _w, _x, _timeout: (r, [], [])
+        )
+
+        assert manager.cursorPosition_setAndVerify(Position(x=100, y=200)) is True
+        assert root.query_calls == 2
+
+
+    def test_ignored_warp_falls_back_to_xtest(self, monkeypatch) -> None:
+        """An ignored native warp should be retried once with XTest motion."""
+        root = _FakeRoot(replies=[(0, 0), (100, 200)])
+        manager = _displayManager_build(_FakeDisplay(root))
+        motions: list[Position] = []
+        monkeypatch.setattr(manager, "cursorPosition_set", lambda _position: None)
+        monkeypatch.setattr(manager, "cursorPosition_setViaXTest", motions.append)
+
+        assert manager.cursorPosition_setAndVerify(Position(x=100, y=200)) is True
+        assert motions == [Position(x=100, y=200)]
+        assert root.query_calls == 2
+
+class TestCursorPositionSet:
+    """Tests for fire-and-forget cursor warps."""
+
+    def test_warp_flushes_without_round_trip(self, caplog) -> None:
+        """With DEBUG off, a warp should flush once and never query or sync."""
+        caplog.set_level(logging.INFO, logger="tx2tx.x11.display")
+        root = _FakeRoot(replies=[(0, 0)])
+        display = _FakeDisplay(root)
+        manager = _displayManager_build(display)
+
+        manager.cursorPosition_set(Position(x=10, y=20))
+
+        assert display.display.warps_get() == [(10, 20)]
+        assert all(len(binary) == 24 for binary in display.display.requests)
+        assert display.flush_calls == 1
+        assert display.sync_calls == 0
+        assert root.query_calls == 0
+
+
+    def test_xtest_motion_is_queued_pre_encoded(self, caplog) -> None:
+        """Without xcb, XTest motion should queue one encoded FakeInput and flush."""
+        caplog.set_level(logging.INFO, logger="tx2tx.x11.display")
+        display = _FakeDisplay(_FakeRoot(replies=[(0, 0)]))
+        manager = _displayManager_build(display)
+
+        manager.cursorPosition_setViaXTest(Position(x=-3, y=500))
+
+        assert display.display.requests == [
+            wire.fakeInput_pack(132, X.MotionNotify, 0, -3, 500)
+        ]
+        assert len(display.display.requests[0]) == 36
+        assert display.flush_calls == 1
+
+    def test_warp_strategy_bound_at_init(self, monkeypatch) -> None:
+        """cursorPosition_set should be bound to the session's method up front."""
+        monkeypatch.setattr("tx2tx.x11.display.is_native_x11", lambda: False)
+
+        native = DisplayManager(x11native=True)
+        emulated = DisplayManager()
+
+        assert native.cursorPosition_set == native.cursorPosition_setViaWarpPointer
+        assert emulated.cursorPosition_set == emulated.cursorPosition_setViaXTest
+
+    def test_xtest_motion_uses_xcb_channel_when_xlib_idle(self, caplog) -> None:
+        """With nothing queued on python-xlib, XTest motion should go through xcb."""
+        caplog.set_level(logging.INFO, logger="tx2tx.x11.display")
+        display = _FakeDisplay(_FakeRoot(replies=[(0, 0)]))
+        manager = _displayManager_build(display)
+        channel = _FakeXcbChannel()
+        manager._xcb = channel
+        manager.connection_sync()
+
+        manager.cursorPosition_setViaXTest(Position(x=7, y=8))
+
+        assert channel.motions == [(7, 8)]
+        assert channel.flush_calls == 1
+        assert channel.poll_calls == 1
+        assert display.display.requests == []
+
+    def test_warp_after_queued_xlib_request_stays_on_xlib(self, caplog) -> None:
+        """A warp behind an unprocessed python-xlib request must not overtake it on xcb."""
+        caplog.set_level(logging.INFO, logger="tx2tx.x11.display")
+        display = _FakeDisplay(_FakeRoot(replies=[(0, 0)]))
+        manager = _displayManager_build(display)
+        channel = _FakeXcbChannel()
+        manager._xcb = channel
+        manager.connection_sync()
+        wire.request_queue(display.display, b"\x00" * 4)  # e.g. an ungrab
+
+        manager.cursorPosition_setViaWarpPointer(Position(x=7, y=8))
+
+        assert channel.warps == []
+        assert display.display.warps_get() == [(7, 8)]
+
+    def test_verify_queries_connection_that_carried_motion(self, caplog) -> None:
+        """Without XTEST on xcb, motion and its verification query stay on python-xlib."""
+        caplog.set_level(logging.INFO, logger="tx2tx.x11.display")
+        root = _FakeRoot(replies=[(7, 8)])
+        manager = _displayManager_build(_FakeDisplay(root))
+        manager._native_x11 = False
+        manager.cursorPosition_set = manager.cursorPosition_setViaXTest
+        xcb_queries: list[int] = []
+        manager._xcb = SimpleNamespace(
+            has_xtest=False, pointer_query=lambda: xcb_queries.append(1) or (0, 0)
+        )
+
+        assert manager.cursorPosition_setAndVerify(Position(x=7, y=8)) is True
+        assert xcb_queries == []
+        assert root.query_calls == 1
+
+    def test_failed_warp_is_logged(self, monkeypatch, caplog) -> None:
+        """A warp that raises should be logged, not propagated or silently lost."""
+        manager = _displayManager_build(_FakeDisplay(_FakeRoot(replies=[(0, 0)])))
+
+        def _warp_fail(_x: int, _y: int) -> None:
+            raise ConnectionResetError("gone")
+
+        monkeypatch.setattr(manager, "_warpRequest_queue", _warp_fail)
+
+        manager.cursorPosition_setViaWarpPointer(Position(x=7, y=8))
+
+        assert "warp_pointer to (7, 8) failed" in caplog.text
+
+
+class TestCursorConfine:
+    """Tests for the confinement grab."""
+
+    def test_confine_ungrabs_and_retries_already_grabbed(self, monkeypatch) -> None:
+        """An AlreadyGrabbed reply should be retried after a prior ungrab."""
+        monkeypatch.setattr("tx2tx.x11.display.time.sleep", lambda _seconds: None)
+        root = _FakeRoot(replies=[(5, 5)])
+        display = _FakeDisplay(root)
+        manager = _displayManager_build(display)
+        monkeypatch.setattr(manager, "cursorPosition_set", lambda _position: None)
+        monkeypatch.setattr(manager, "cursorPosition_setViaXTest", lambda _position: None)
+        statuses: list[int] = [1, 0]
+        replies: list[int] = []
+
+        def _grab_send(_confine_to: Any, _cursor: Any) -> SimpleNamespace:
+            cookie = SimpleNamespace(status=statuses.pop(0))
+            cookie.reply = lambda: replies.append(cookie.status)
+            return cookie
+
+        monkeypatch.setattr(manager, "_pointerGrab_send", _grab_send)
+
+        manager.cursor_confine(Position(x=50, y=60))
+
+        assert display.ungrab_calls == 1
+        assert replies == [1, 0]
+        assert root.query_calls == 1
+        assert manager._original_position == Position(x=5, y=5)
+        assert manager._cursor_confined is True
+
+    def test_confine_and_release_back_native_warp_with_xtest(self, monkeypatch) -> None:
+        """Confine/release moves should land even if the compositor ignores the warp."""
+        root = _FakeRoot(replies=[(5, 5)])
+        display = _FakeDisplay(root)
+        manager = _displayManager_build(display)
+        cookie = SimpleNamespace(status=0, reply=lambda: None)
+        monkeypatch.setattr(manager, "_pointerGrab_send", lambda *_args: cookie)
+
+        manager.cursor_confine(Position(x=50, y=60))
+        manager.cursor_release()
+
+        assert display.display.warps_get() == [(50, 60), (5, 5)]
+        assert [binary for binary in display.display.requests if binary[0] == 132] == [
+            wire.fakeInput_pack(132, X.MotionNotify, 0, 50, 60),
+            wire.fakeInput_pack(132, X.MotionNotify, 0, 5, 5),
+        ]
+
+    def test_grab_noise_drain_stops_at_input_event(self) -> None:
+        """Leading focus/crossing events should go; input and later events stay."""
+        display = _FakeDisplay(_FakeRoot(replies=[(0, 0)]))
+        manager = _displayManager_build(display)
+        display.display.event_queue = [
+            SimpleNamespace(type=event_type)
+            for event_type in (X.FocusOut, X.EnterNotify, X.ButtonPress, X.FocusIn)
+        ]
+
+        manager._grabNoise_drain()
+
+        assert [event.type for event in display.display.event_queue] == [
+            X.ButtonPress,
+            X.FocusIn,
+        ]
+
+class TestCursorHideStrategy:
+    """Tests for per-connection cursor-hide strategy selection."""
+
+    def test_native_with_xfixes_prefers_xfixes(self) -> None:
+        """Native sessions with XFIXES should try XFixes first."""
+        manager = _displayManager_build(_FakeDisplay(_FakeRoot(replies=[(0, 0)])))
+        manager._has_xfixes = True
+
+        methods = manager._cursorHideMethods_resolve()
+
+        assert methods[0] == manager._cursorXFixes_hide
+        assert methods[1:] == (manager._cursorBlankOnRoot_set, manager._cursorRemoteOnRoot_set)
+
+    def test_hide_falls_through_table_until_success(self) -> None:
+        """cursor_hide should stop at the first method that succeeds."""
+        manager = _displayManager_build(_FakeDisplay(_FakeRoot(replies=[(0, 0)])))
+        calls: list[str] = []
+
+        def _method_build(name: str, succeeds: bool) -> Any:
+            def _method() -> bool:
+                calls.append(name)
+                return succeeds
+
+            return _method
+
+        manager._cursor_hide_methods = (
+            _method_build("first", False),
+            _method_build("second", True),
+            _method_build("third", True),
+        )
+
+        manager.cursor_hide()
+
+        assert calls == ["first", "second"]
+        assert manager._cursor_hidden is True
+
+        manager._cursor_hidden = False
+        manager.cursor_hide()
+
+        assert calls == ["first", "second", "second"]
+
+
+class _FakePixmap:
+    """Fake 1x1 bitmap recording the requests made against it."""
+
+    def __init__(self, calls: list[str]) -> None:
+        """Initialize fake pixmap sharing a call log."""
+        self._calls: list[str] = calls
+
+    def create_gc(self, **_kwargs: Any) -> SimpleNamespace:
+        """Record GC creation."""
+        self._calls.append("create_gc")
+        return SimpleNamespace(free=lambda: self._calls.append("gc.free"))
+
+    def fill_rectangle(self, *_args: Any) -> None:
+        """Record the clearing fill."""
+        self._calls.append("fill_rectangle")
+
+    def create_cursor(self, mask: Any, foreground: Any, background: Any, *_args: Any) -> str:
+        """Record cursor creation and return a placeholder cursor."""
+        assert mask is self
+        assert foreground == background == (0, 0, 0)
+        self._calls.append("create_cursor")
+        return "blank-cursor"
+
+    def free(self) -> None:
+        """Record pixmap release."""
+        self._calls.append("pixmap.free")
+
+
+class TestBlankCursor:
+    """Tests for blank cursor construction."""
+
+    def test_blank_cursor_is_built_from_cleared_bitmap(self) -> None:
+        """The blank cursor should use a cleared bitmap and a single flush."""
+        calls: list[str] = []
+        root = _FakeRoot(replies=[(0, 0)])
+        root.create_pixmap = lambda _width, _height, _depth: _FakePixmap(calls)
+        display = _FakeDisplay(root)
+        manager = _displayManager_build(display)
+
+        assert manager._ensure_blank_cursor() == "blank-cursor"
+        assert calls == [
+            "create_gc",
+            "fill_rectangle",
+            "create_cursor",
+            "gc.free",
+            "pixmap.free",
+        ]
+        assert display.flush_calls == 1
+        assert display.sync_calls == 0
+
+class TestRequestsBatch:
+    """Tests for grouping requests behind one sync."""
+
+    def test_batch_defers_syncs_to_single_exit_sync(self) -> None:
+        """Syncs inside a batch should flush, with one sync on exit."""
+        root = _FakeRoot(replies=[(0, 0)])
+        display = _FakeDisplay(root)
+        manager = _displayManager_build(display)
+
+        with manager.requests_batch():
+            with manager.requests_batch():
+                manager._display_sync(display)
+            manager._display_sync(display)
+            assert display.sync_calls == 0
+
+        assert display.flush_calls == 2
+        assert display.sync_calls == 1
+        assert manager._in_batch is False
+
+
+class TestDisplayPool:
+    """Tests for the shared Display connection pool."""
+
+    def test_pool_shares_connection_until_last_release(self, monkeypatch) -> None:
+        """Acquires on one name should share a Display closed on last release."""
+        opened: list[SimpleNamespace] = []
+
+        def _display_open(_name: Any) -> SimpleNamespace:
+            display = SimpleNamespace(closed=False, display=SimpleNamespace())
+            display.close = lambda: setattr(display, "closed", True)
+            opened.append(display)
+            return display
+
+        monkeypatch.setattr(display_module.xdisplay, "Display", _display_open)
+        monkeypatch.setattr(display_module, "_display_pool", {})
+
+        first = display_module._pooledDisplay_acquire(":9")
+        second = display_module._pooledDisplay_acquire(":9")
+        display_module._pooledDisplay_release(":9")
+
+        assert first is second
+        assert len(opened) == 1
+        assert first.closed is False
+
+        display_module._pooledDisplay_release(":9")
+
+        assert first.closed is True
+        assert display_module._display_pool == {}
+
+    def test_close_notifies_connection_listeners(self, monkeypatch) -> None:
+        """Closing the connection should tell listeners to drop cached handles."""
+        manager = _displayManager_build(_FakeDisplay(_FakeRoot(replies=[(0, 0)])))
+        monkeypatch.setattr(display_module, "_display_pool", {})
+        calls: list[int] = []
+        manager.connectionListener_add(lambda: calls.append(1))
+
+        manager.connection_close()
+
+        assert calls == [1]
+        assert manager._display is None
+
+    def test_close_destroys_cursor_overlay_window(self, monkeypatch) -> None:
+        """Closing should not leave the overlay window behind on a pooled connection."""
+        manager = _displayManager_build(_FakeDisplay(_FakeRoot(replies=[(0, 0)])))
+        monkeypatch.setattr(display_module, "_display_pool", {})
+        destroyed: list[int] = []
+        manager._cursor_overlay_window = SimpleNamespace(destroy=lambda: destroyed.append(1))
+
+        manager.connection_close()
+
+        assert destroyed == [1]
+        assert manager._cursor_overlay_window is None
+
+
+class TestUnixSocketCandidates:
+    """Tests for local X11 socket discovery."""
+
+    def test_candidates_prefer_prefix_over_tmp(self, monkeypatch, tmp_path) -> None:
+        """An existing $PREFIX/tmp socket should be listed, missing ones skipped."""
+        socket_dir = tmp_path / "tmp" / ".X11-unix"
+        socket_dir.mkdir(parents=True)
+        (socket_dir / "X7").touch()
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setenv("TMPDIR", str(tmp_path / "missing"))
+        monkeypatch.setenv("PREFIX", str(tmp_path))
+
+        candidates = display_module._unixSocketCandidates_get(7)
+
+        assert candidates[0] == str(socket_dir / "X7")
+        assert all("missing" not in path for path in candidates)
+
+
+class TestDisplaySocketTune:
+    """Tests for X11 socket options."""
+
+    def test_tcp_socket_gets_nodelay(self) -> None:
+        """TCP connections should have Nagle disabled."""
+        options: list[tuple[int, int, int]] = []
+        sock = SimpleNamespace(
+            family=display_module.socket.AF_INET,
+            setsockopt=lambda level, name, value: options.append((level, name, value)),
+        )
+
+        display_module._displaySocket_tune(SimpleNamespace(display=SimpleNamespace(socket=sock)))
+
+        assert options == [
+            (display_module.socket.IPPROTO_TCP, display_module.socket.TCP_NODELAY, 1)
+        ]
@@ -6,7 +6,10 @@ from types import SimpleNamespace
 from typing import Any
 from typing import cast
 
-from tx2tx.common.types import EventType, KeyEvent
+from Xlib import X
+
+from tx2tx.common.types import EventType, KeyEvent, MouseEvent, Position
+from tx2tx.x11 import wire
 from tx2tx.x11.injector import EventInjector
 
 
@@ -33,10 +36,12 @@ class _FakeRoot:
     def __init__(self, child_window: Any) -> None:
         """Initialize fake root with pointer child window."""
         self._child_window = child_window
+        self.query_calls: int = 0
 
     def query_pointer(self) -> SimpleNamespace:
-        """Return pointer reply with child window."""
-        return SimpleNamespace(child=self._child_window)
+        """Return pointer reply with child window at a fixed position."""
+        self.query_calls += 1
+        return SimpleNamespace(child=self._child_window, root_x=10, root_y=20)
 
 
 class _FakeDisplay:
@@ -46,12 +51,17 @@ class _FakeDisplay:
         """Initialize fake display state."""
         self._root = _FakeRoot(child_window=child_window)
         self.sync_calls: int = 0
+        self.flush_calls: int = 0
         self.keysym_calls: list[int] = []
 
     def query_extension(self, _name: str) -> object:
         """Return fake extension object."""
         return object()
 
+    def has_extension(self, _name: str) -> bool:
+        """Report no extensions so injection uses xtest.fake_input."""
+        return False
+
     def screen(self) -> SimpleNamespace:
         """Return fake screen with fake root."""
         return SimpleNamespace(root=self._root)
@@ -65,17 +75,33 @@ class _FakeDisplay:
         """Record sync calls."""
         self.sync_calls += 1
 
+    def flush(self) -> None:
+        """Record flush calls."""
+        self.flush_calls += 1
+
+
 class _FakeDisplayManager:
     """Fake display manager returning a fake display."""
 
     def __init__(self, display: _FakeDisplay) -> None:
         """Initialize fake display manager."""
         self._display = display
+        self._listeners: list[Any] = []
 
     def display_get(self) -> _FakeDisplay:
         """Return fake display."""
         return self._display
 
+    def connectionListener_add(self, listener: Any) -> None:
+        """Record a connection listener."""
+        self._listeners.append(listener)
+
+    def reconnect(self, display: _FakeDisplay) -> None:
+        """Swap in a new display and notify listeners."""
+        self._display = display
+        for listener in self._listeners:
+            listener()
+
 
 class TestEventInjectorFocus:
     """Tests for pointer-window focus behavior during key injection."""
@@ -101,7 +127,8 @@ class TestEventInjectorFocus:
         assert child_window.focus_calls == 1
         assert len(fake_calls) == 1
         assert fake_calls[0][2] == 38
-        assert fake_display.sync_calls == 1
+        assert fake_display.flush_calls == 1
+        assert fake_display.sync_calls == 0
 
     def test_key_event_without_pointer_child_still_injects(
         self, monkeypatch
@@ -122,7 +149,8 @@ class TestEventInjectorFocus:
 
         assert len(fake_calls) == 1
         assert fake_calls[0][2] == 44
-        assert fake_display.sync_calls == 1
+        assert fake_display.flush_calls == 1
+        assert fake_display.sync_calls == 0
 
     def test_key_event_focuses_deepest_pointer_window(self, monkeypatch) -> None:
         """Key injection should focus the deepest window under pointer."""
@@ -182,3 +210,300 @@ class TestEventInjectorFocus:
 
         assert child_window.focus_calls == 0
         assert len(fake_calls) == 1
+
+    def test_repeat_key_events_reuse_cached_focus_window(self, monkeypatch) -> None:
+        """A second key at the same pointer position should skip the walk and refocus."""
+        leaf_window = _FakeWindow(child_window=0)
+        frame_window = _FakeWindow(child_window=leaf_window)
+        fake_display = _FakeDisplay(child_window=frame_window)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        monkeypatch.setattr("tx2tx.x11.injector.xtest.fake_input", lambda *_args, **_kw: None)
+
+        injector.keyEvent_inject(KeyEvent(event_type=EventType.KEY_PRESS, keycode=24))
+        injector.keyEvent_inject(KeyEvent(event_type=EventType.KEY_RELEASE, keycode=24))
+
+        assert leaf_window.focus_calls == 1
+        assert fake_display._root.query_calls == 2
+
+
+class TestEventInjectorHandles:
+    """Tests for cached connection handles."""
+
+    def test_reconnect_rebinds_to_new_display(self, monkeypatch) -> None:
+        """Injection after a manager reconnect should use the new display."""
+        first_display = _FakeDisplay(child_window=0)
+        manager = _FakeDisplayManager(first_display)
+        injector = EventInjector(cast(Any, manager))
+        monkeypatch.setattr("tx2tx.x11.injector.xtest.fake_input", lambda *_args, **_kw: None)
+
+        injector.keyEvent_inject(KeyEvent(event_type=EventType.KEY_PRESS, keycode=24))
+        second_display = _FakeDisplay(child_window=0)
+        manager.reconnect(second_display)
+        injector.keyEvent_inject(KeyEvent(event_type=EventType.KEY_RELEASE, keycode=24))
+
+        assert first_display.flush_calls == 1
+        assert second_display.flush_calls == 1
+
+
+class TestEventInjectorBatch:
+    """Tests for motion coalescing inside injections_batch()."""
+
+    def test_batch_sends_only_latest_motion(self, monkeypatch) -> None:
+        """Moves inside a batch should collapse to one motion and one flush."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[tuple[int, dict[str, int]]] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, **kwargs: fake_calls.append((event_type, kwargs)),
+        )
+
+        with injector.injections_batch():
+            for x in (10, 20, 30):
+                injector.mouseEvent_inject(
+                    MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=x, y=5))
+                )
+
+        assert fake_calls == [(X.MotionNotify, {"detail": 0, "x": 30, "y": 5})]
+        assert fake_display.flush_calls == 1
+
+    def test_batch_sends_pending_motion_before_button(self, monkeypatch) -> None:
+        """A button event inside a batch should follow the latest motion."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[int] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, **_kwargs: fake_calls.append(event_type),
+        )
+
+        with injector.injections_batch():
+            injector.mouseEvent_inject(
+                MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=1, y=1))
+            )
+            injector.mouseEvent_inject(
+                MouseEvent(
+                    event_type=EventType.MOUSE_BUTTON_PRESS,
+                    position=Position(x=2, y=2),
+                    button=1,
+                )
+            )
+            injector.mouseEvent_inject(
+                MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=3, y=3))
+            )
+
+        assert fake_calls == [X.MotionNotify, X.ButtonPress, X.MotionNotify]
+        assert fake_display.flush_calls == 1
+
+
+class _FakeProtocolDisplay:
+    """Fake python-xlib protocol display recording queued requests."""
+
+    def __init__(self) -> None:
+        """Initialize request log."""
+        self.requests: list[bytes] = []
+
+    def send_request(self, request: Any, _wait_for_response: bool) -> None:
+        """Record encoded request bytes."""
+        self.requests.append(request._binary)
+
+
+class _FakeXtestDisplay(_FakeDisplay):
+    """Fake display advertising XTEST with a known opcode."""
+
+    def __init__(self) -> None:
+        """Initialize fake display with a protocol display."""
+        super().__init__(child_window=0)
+        self.display = _FakeProtocolDisplay()
+
+    def has_extension(self, name: str) -> bool:
+        """Report XTEST as present."""
+        return name == "XTEST"
+
+    def get_extension_major(self, _name: str) -> int:
+        """Return a fixed XTEST opcode."""
+        return 132
+
+
+class TestEventInjectorRawXtest:
+    """Tests for pre-encoded XTEST FakeInput requests."""
+
+    def test_injection_queues_encoded_fake_input(self, monkeypatch) -> None:
+        """With XTEST present, events should be queued as encoded requests."""
+        fake_display = _FakeXtestDisplay()
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+
+        def _unexpected(*_args: Any, **_kwargs: Any) -> None:
+            raise AssertionError("python-xlib fake_input should not be used")
+
+        monkeypatch.setattr("tx2tx.x11.injector.xtest.fake_input", _unexpected)
+
+        injector.mouseEvent_inject(
+            MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=7, y=9))
+        )
+        injector.keyEvent_inject(
+            KeyEvent(event_type=EventType.KEY_PRESS, keycode=24, state=0x4)
+        )
+
+        assert fake_display.display.requests == [
+            wire.fakeInput_pack(132, X.MotionNotify, 0, 7, 9),
+            wire.fakeInput_pack(132, X.KeyPress, 24),
+        ]
+        assert fake_display.flush_calls == 2
+
+
+class TestEventInjectorKeysymCache:
+    """Tests for cached keysym to keycode lookups."""
+
+    def test_repeat_keysym_looked_up_once(self, monkeypatch) -> None:
+        """Repeated keysyms should reuse the cached keycode."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_details: list[int] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, _event_type, detail: fake_details.append(detail),
+        )
+
+        for event_type in (EventType.KEY_PRESS, EventType.KEY_RELEASE, EventType.KEY_PRESS):
+            injector.keyEvent_inject(KeyEvent(event_type=event_type, keycode=12, keysym=0x0061))
+
+        assert fake_display.keysym_calls == [0x0061]
+        assert fake_details == [38, 38, 38]
+
+
+class TestEventInjectorClick:
+    """Tests for button injection round-trips."""
+
+    def test_click_flushes_without_sync(self, monkeypatch) -> None:
+        """Press and release should each flush once and never sync."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[tuple[int, int]] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, detail=0, **_kwargs: fake_calls.append(
+                (event_type, detail)
+            ),
+        )
+
+        for event_type in (EventType.MOUSE_BUTTON_PRESS, EventType.MOUSE_BUTTON_RELEASE):
+            injector.mouseEvent_inject(
+                MouseEvent(event_type=event_type, position=Position(x=4, y=4), button=1)
+            )
+
+        assert fake_calls == [
+            (X.MotionNotify, 0),
+            (X.ButtonPress, 1),
+            (X.MotionNotify, 0),
+            (X.ButtonRelease, 1),
+        ]
+        assert fake_display.flush_calls == 2
+        assert fake_display.sync_calls == 0
+
+    def test_click_in_batch_moves_once(self, monkeypatch) -> None:
+        """Within one batch a repeated position should not be re-sent."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[tuple[int, int]] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, detail=0, **_kwargs: fake_calls.append(
+                (event_type, detail)
+            ),
+        )
+
+        with injector.injections_batch():
+            for event_type in (EventType.MOUSE_BUTTON_PRESS, EventType.MOUSE_BUTTON_RELEASE):
+                injector.mouseEvent_inject(
+                    MouseEvent(event_type=event_type, position=Position(x=4, y=4), button=1)
+                )
+
+        assert fake_calls == [
+            (X.MotionNotify, 0),
+            (X.ButtonPress, 1),
+            (X.ButtonRelease, 1),
+        ]
+        assert fake_display.flush_calls == 1
+
+    def test_out_of_band_move_does_not_skip_next_button_move(self, monkeypatch) -> None:
+        """A pointer moved by someone else between batches should be moved back."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[tuple[int, int, int]] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, detail=0, x=0, y=0: fake_calls.append(
+                (event_type, x, y)
+            ),
+        )
+
+        with injector.injections_batch():
+            injector.mouseEvent_inject(
+                MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=4, y=4))
+            )
+        # The local user (or another client) moves the pointer here
+        with injector.injections_batch():
+            injector.mouseEvent_inject(
+                MouseEvent(
+                    event_type=EventType.MOUSE_BUTTON_PRESS, position=Position(x=4, y=4), button=1
+                )
+            )
+
+        assert fake_calls == [
+            (X.MotionNotify, 4, 4),
+            (X.MotionNotify, 4, 4),
+            (X.ButtonPress, 0, 0),
+        ]
+
+    def test_invalidate_resends_move_within_batch(self, monkeypatch) -> None:
+        """Hiding the cursor mid-batch should drop the remembered position."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[int] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, detail=0, **_kwargs: fake_calls.append(event_type),
+        )
+
+        with injector.injections_batch():
+            injector.mouseEvent_inject(
+                MouseEvent(
+                    event_type=EventType.MOUSE_BUTTON_PRESS, position=Position(x=4, y=4), button=1
+                )
+            )
+            injector.pointerState_invalidate()
+            injector.mouseEvent_inject(
+                MouseEvent(
+                    event_type=EventType.MOUSE_BUTTON_RELEASE, position=Position(x=4, y=4), button=1
+                )
+            )
+
+        assert fake_calls == [X.MotionNotify, X.ButtonPress, X.MotionNotify, X.ButtonRelease]
+
+    def test_button_at_new_position_moves_first(self, monkeypatch) -> None:
+        """A button event at a different position should still move first."""
+        fake_display = _FakeDisplay(child_window=0)
+        injector = EventInjector(cast(Any, _FakeDisplayManager(fake_display)))
+        fake_calls: list[tuple[int, int, int]] = []
+        monkeypatch.setattr(
+            "tx2tx.x11.injector.xtest.fake_input",
+            lambda _display, event_type, detail=0, x=0, y=0: fake_calls.append(
+                (event_type, x, y)
+            ),
+        )
+
+        injector.mouseEvent_inject(
+            MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=4, y=4))
+        )
+        injector.mouseEvent_inject(
+            MouseEvent(
+                event_type=EventType.MOUSE_BUTTON_PRESS, position=Position(x=6, y=4), button=1
+            )
+        )
+
+        assert fake_calls == [
+            (X.MotionNotify, 4, 4),
+            (X.MotionNotify, 6, 4),
+            (X.ButtonPress, 0, 0),
+        ]
@@ -0,0 +1,178 @@
+"""Unit tests for XRecord event capture."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+from typing import cast
+
+from Xlib import X
+from Xlib.ext import record
+from Xlib.protocol import event as xevent
+
+from tx2tx.common.types import EventType, KeyEvent, MouseEvent, Position
+from tx2tx.x11.record_capturer import XRecordCapturer, _CoalescingEventQueue
+
+
+class _FakeDisplay:
+    """Fake display advertising the RECORD extension."""
+
+    def __init__(self) -> None:
+        """Initialize fake display state."""
+        self.display = object()
+
+    def has_extension(self, name: str) -> bool:
+        """Report RECORD as present."""
+        return name == "RECORD"
+
+    def record_extension(self) -> object:
+        """Return a placeholder record extension."""
+        return object()
+
+
+class _FakeDisplayManager:
+    """Fake display manager returning a fake display."""
+
+    def __init__(self, display: _FakeDisplay) -> None:
+        """Initialize fake display manager."""
+        self._display = display
+
+    def display_get(self) -> _FakeDisplay:
+        """Return fake display."""
+        return self._display
+
+
+def _capturer_build() -> XRecordCapturer:
+    """Build a capturer over fake display objects."""
+    return XRecordCapturer(cast(Any, _FakeDisplayManager(_FakeDisplay())))
+
+
+class TestXEventParse:
+    """Tests for recorded X event translation."""
+
+    def test_button_press_maps_to_mouse_event(self) -> None:
+        """ButtonPress should become a positioned button-press event."""
+        xev = SimpleNamespace(type=X.ButtonPress, root_x=5, root_y=6, detail=3)
+
+        event = _capturer_build()._xEvent_parse(xev)
+
+        assert event == MouseEvent(
+            event_type=EventType.MOUSE_BUTTON_PRESS, position=Position(x=5, y=6), button=3
+        )
+
+    def test_key_release_maps_to_key_event(self) -> None:
+        """KeyRelease should become a key-release event."""
+        xev = SimpleNamespace(type=X.KeyRelease, detail=38, root_x=0, root_y=0)
+
+        event = _capturer_build()._xEvent_parse(xev)
+
+        assert event == KeyEvent(event_type=EventType.KEY_RELEASE, keycode=38)
+
+    def test_unhandled_event_type_is_ignored(self) -> None:
+        """Event types without a builder should be dropped."""
+        xev = SimpleNamespace(type=X.Expose)
+
+        assert _capturer_build()._xEvent_parse(xev) is None
+
+
+class TestEventQueue:
+    """Tests for captured event queueing."""
+
+    def test_consecutive_moves_collapse_to_latest(self) -> None:
+        """Unread moves should be replaced while other events keep their order."""
+        capturer = _capturer_build()
+        for xev in (
+            SimpleNamespace(type=X.MotionNotify, root_x=1, root_y=1, detail=0),
+            SimpleNamespace(type=X.MotionNotify, root_x=2, root_y=2, detail=0),
+            SimpleNamespace(type=X.ButtonPress, root_x=2, root_y=2, detail=1),
+            SimpleNamespace(type=X.MotionNotify, root_x=3, root_y=3, detail=0),
+            SimpleNamespace(type=X.MotionNotify, root_x=4, root_y=4, detail=0),
+        ):
+            capturer._event_queue.put(capturer._xEvent_parse(xev))
+
+        events = []
+        while (event := capturer.event_get(block=False)) is not None:
+            events.append(event)
+
+        assert [(event.event_type, event.position) for event in events] == [
+            (EventType.MOUSE_MOVE, Position(x=2, y=2)),
+            (EventType.MOUSE_BUTTON_PRESS, Position(x=2, y=2)),
+            (EventType.MOUSE_MOVE, Position(x=4, y=4)),
+        ]
+
+    def test_blocking_get_times_out_when_empty(self) -> None:
+        """A blocking read should return None after its timeout."""
+        assert _capturer_build().event_get(block=True, timeout=0.01) is None
+
+    def test_full_queue_drops_oldest_move_first(self) -> None:
+        """Overflow should discard queued motion before key events."""
+        queue = _CoalescingEventQueue(max_events=3)
+        move = MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=1, y=1))
+        press = KeyEvent(event_type=EventType.KEY_PRESS, keycode=38)
+        release = KeyEvent(event_type=EventType.KEY_RELEASE, keycode=38)
+        for event in (move, press, release, press):
+            queue.put(event)
+
+        assert [queue.get(block=False) for _ in range(4)] == [press, release, press, None]
+
+    def test_full_queue_without_moves_drops_new_move(self) -> None:
+        """A move arriving at a queue full of key events should be dropped."""
+        queue = _CoalescingEventQueue(max_events=2)
+        press = KeyEvent(event_type=EventType.KEY_PRESS, keycode=38)
+        release = KeyEvent(event_type=EventType.KEY_RELEASE, keycode=38)
+        for event in (press, release):
+            queue.put(event)
+        queue.put(MouseEvent(event_type=EventType.MOUSE_MOVE, position=Position(x=1, y=1)))
+
+        assert [queue.get(block=False) for _ in range(3)] == [press, release, None]
+
+
+def _inputEvent_encode(event_class: Any, detail: int, root_x: int, root_y: int) -> bytes:
+    """Encode a core input event with python-xlib."""
+    return event_class(
+        detail=detail,
+        time=0,
+        root=1,
+        window=1,
+        child=0,
+        root_x=root_x,
+        root_y=root_y,
+        event_x=0,
+        event_y=0,
+        state=0,
+        same_screen=1,
+        sequence_number=0,
+    )._binary
+
+
+class TestRecordReplyDecode:
+    """Tests for decoding XRecord reply payloads."""
+
+    def test_reply_events_decode_to_queued_events(self) -> None:
+        """Packed core events should decode the same as python-xlib would."""
+        capturer = _capturer_build()
+        data = _inputEvent_encode(xevent.ButtonPress, 2, -3, 700) + _inputEvent_encode(
+            xevent.MotionNotify, 0, 9, 11
+        )
+        reply = SimpleNamespace(category=record.FromServer, client_swapped=False, data=data)
+
+        capturer._recordEvents_process(reply)
+
+        assert capturer.event_get(block=False) == MouseEvent(
+            event_type=EventType.MOUSE_BUTTON_PRESS, position=Position(x=-3, y=700), button=2
+        )
+        assert capturer.event_get(block=False) == MouseEvent(
+            event_type=EventType.MOUSE_MOVE, position=Position(x=9, y=11)
+        )
+        assert capturer.event_get(block=False) is None
+
+    def test_non_event_replies_are_ignored(self) -> None:
+        """StartOfData and EndOfData replies should not queue events."""
+        capturer = _capturer_build()
+        data = _inputEvent_encode(xevent.MotionNotify, 0, 9, 11)
+
+        capturer._recordEvents_process(
+            SimpleNamespace(category=record.StartOfData, client_swapped=False, data=data)
+        )
+
+        assert capturer.event_get(block=False) is None
@@ -0,0 +1,580 @@
+"""Unit tests for the X11 software cursor window updates."""
+
+from __future__ import annotations
+
+import struct
+from types import SimpleNamespace
+from typing import Any
+
+from Xlib import X
+from Xlib.protocol import request
+
+from tx2tx.x11 import software_cursor as software_cursor_module
+from tx2tx.x11.software_cursor import SoftwareCursor
+
+
+class _FakeWindow:
+    """Fake cursor window recording configure requests."""
+
+    def __init__(self) -> None:
+        """Initialize fake window state."""
+        self.id: int = 0x400001
+        self.map_calls: int = 0
+        self.unmap_calls: int = 0
+
+    def map(self) -> None:
+        """Record map request."""
+        self.map_calls += 1
+
+    def unmap(self) -> None:
+        """Record unmap request."""
+        self.unmap_calls += 1
+
+
+class _FakeProtocolDisplay:
+    """Fake python-xlib protocol display recording queued requests."""
+
+    def __init__(self) -> None:
+        """Initialize fake protocol display state."""
+        self.requests: list[bytes] = []
+
+    def send_request(self, req: Any, wait_for_response: bool) -> None:
+        """Record encoded request bytes."""
+        self.requests.append(bytes(req._binary))
+
+
+class _FakeDisplay:
+    """Fake X display counting flushes and round-trips."""
+
+    def __init__(self) -> None:
+        """Initialize fake display state."""
+        self.flush_calls: int = 0
+        self.sync_calls: int = 0
+        self.display: _FakeProtocolDisplay = _FakeProtocolDisplay()
+
+    def flush(self) -> None:
+        """Record flush call."""
+        self.flush_calls += 1
+
+    def sync(self) -> None:
+        """Record sync call."""
+        self.sync_calls += 1
+
+
+class _FakeXcbChannel:
+    """Fake libxcb companion channel recording window moves."""
+
+    def __init__(self) -> None:
+        """Initialize fake channel state."""
+        self.moves: list[tuple[int, int, int, bool]] = []
+        self.flush_calls: int = 0
+        self.poll_calls: int = 0
+
+    def window_move(self, window: int, x: int, y: int, stack_above: bool = False) -> None:
+        """Record window move."""
+        self.moves.append((window, x, y, stack_above))
+
+    def flush(self) -> None:
+        """Record flush call."""
+        self.flush_calls += 1
+
+    def errors_poll(self) -> int:
+        """Record error poll."""
+        self.poll_calls += 1
+        return 0
+
+
+class _FakeDisplayManager:
+    """Fake display manager returning a fake display."""
+
+    def __init__(self) -> None:
+        """Initialize fake display manager state."""
+        self.display: _FakeDisplay = _FakeDisplay()
+        self.xcb: _FakeXcbChannel | None = None
+        self.listeners: list[Any] = []
+
+    def display_get(self) -> _FakeDisplay:
+        """Return fake display."""
+        return self.display
+
+    def connectionListener_add(self, listener: Any) -> None:
+        """Record a connection listener."""
+        self.listeners.append(listener)
+
+    def reconnect(self, display: _FakeDisplay) -> None:
+        """Swap in a new display and notify listeners."""
+        self.display = display
+        for listener in self.listeners:
+            listener()
+
+    def xcbChannel_get(self) -> "_FakeXcbChannel | None":
+        """Return fake libxcb channel, if any."""
+        return self.xcb
+
+
+def _cursor_build() -> tuple[SoftwareCursor, _FakeWindow]:
+    """Build a software cursor with an already created fake window."""
+    cursor = SoftwareCursor(display_manager=_FakeDisplayManager())
+    window = _FakeWindow()
+    cursor._window = window
+    cursor._visible = True
+    cursor._mapped = True
+    cursor._handles_bind(cursor._display_manager.display)
+    return cursor, window
+
+
+_CONFIGURE_WINDOW_OPCODE: int = 12
+_CONFIGURE_HEADER = struct.Struct("=BxHIHxx")
+# Value-mask bits in wire order for the fields the cursor sends
+_CONFIGURE_FIELDS: tuple[tuple[int, str], ...] = ((0x01, "x"), (0x02, "y"), (0x40, "stack_mode"))
+
+
+def _configures_get(cursor: SoftwareCursor) -> list[dict[str, int]]:
+    """Decode the ConfigureWindow requests queued by a cursor."""
+    decoded: list[dict[str, int]] = []
+    for binary in cursor._display_manager.display.display.requests:
+        opcode, length, window_id, mask = _CONFIGURE_HEADER.unpack_from(binary)
+        assert opcode == _CONFIGURE_WINDOW_OPCODE
+        assert length * 4 == len(binary)
+        assert window_id == cursor._window.id
+        fields = [name for bit, name in _CONFIGURE_FIELDS if mask & bit]
+        assert len(fields) == len(binary) // 4 - 3
+        decoded.append(
+            {
+                name: struct.unpack_from("=I" if name == "stack_mode" else "=h", binary, offset)[0]
+                for name, offset in zip(fields, range(12, len(binary), 4))
+            }
+        )
+    return decoded
+
+
+class TestSoftwareCursorMove:
+    """Tests for redundant move suppression and periodic re-raise."""
+
+    def test_unchanged_position_is_not_resent(self) -> None:
+        """Moving to the same position twice should issue a single configure."""
+        cursor, window = _cursor_build()
+
+        cursor.move(100, 200)
+        cursor.flush()
+        cursor.move(100, 200)
+        cursor.flush()
+
+        assert _configures_get(cursor) == [{"x": 105, "y": 205, "stack_mode": X.Above}]
+
+    def test_restack_only_on_first_move(self) -> None:
+        """Moves within the raise interval should only reposition the window."""
+        cursor, window = _cursor_build()
+
+        cursor.move(10, 10)
+        cursor.flush()
+        cursor.move(20, 30)
+        cursor.flush()
+
+        assert _configures_get(cursor)[0]["stack_mode"] == X.Above
+        assert _configures_get(cursor)[1] == {"x": 25, "y": 35}
+
+    def test_restack_after_raise_interval(self) -> None:
+        """A move after the raise interval should raise the window again."""
+        cursor, window = _cursor_build()
+
+        cursor.move(10, 10)
+        cursor.flush()
+        cursor._raised_ns -= 10_000_000_000
+        cursor.move(20, 30)
+        cursor.flush()
+
+        assert _configures_get(cursor)[1] == {"x": 25, "y": 35, "stack_mode": X.Above}
+
+    def test_show_raises_on_next_move(self) -> None:
+        """Re-mapping the window should restack it on the next move."""
+        cursor, window = _cursor_build()
+
+        cursor.move(10, 10)
+        cursor.flush()
+        cursor.hide()
+        cursor.flush()
+        cursor.show()
+        cursor.move(20, 30)
+        cursor.flush()
+
+        assert window.map_calls == 1
+        assert _configures_get(cursor)[1]["stack_mode"] == X.Above
+
+
+class TestSoftwareCursorWire:
+    """Tests for the pre-encoded ConfigureWindow requests."""
+
+    def test_encoding_matches_xlib_request(self) -> None:
+        """Pre-encoded moves should match python-xlib's ConfigureWindow bytes."""
+        cursor, _ = _cursor_build()
+        cursor.move(-10, 1075)
+        cursor.flush()
+        cursor.move(300, 400)
+        cursor.flush()
+
+        expected = _FakeProtocolDisplay()
+        request.ConfigureWindow(
+            display=expected, window=0x400001, attrs={"x": -5, "y": 1080, "stack_mode": X.Above}
+        )
+        request.ConfigureWindow(display=expected, window=0x400001, attrs={"x": 305, "y": 405})
+
+        assert cursor._display_manager.display.display.requests == expected.requests
+
+
+class TestSoftwareCursorXcb:
+    """Tests for routing cursor moves over the libxcb companion channel."""
+
+    def test_moves_use_xcb_after_first_flush(self) -> None:
+        """The first flush syncs python-xlib once; later moves go over libxcb."""
+        display_manager = _FakeDisplayManager()
+        display_manager.xcb = _FakeXcbChannel()
+        cursor = SoftwareCursor(display_manager=display_manager)
+        window = _FakeWindow()
+        cursor._window = window
+        cursor._visible = True
+        cursor._mapped = True
+        cursor._handles_bind(display_manager.display)
+
+        cursor.move(10, 10)
+        cursor.flush()
+        cursor.move(20, 30)
+        cursor.flush()
+
+        assert len(_configures_get(cursor)) == 1
+        assert display_manager.xcb.moves == [(window.id, 25, 35, False)]
+        assert display_manager.xcb.flush_calls == 1
+        assert display_manager.xcb.poll_calls == 1
+        assert display_manager.display.sync_calls == 1
+        assert display_manager.display.flush_calls == 0
+
+    def test_new_channel_on_same_display_replaces_closed_one(self) -> None:
+        """A reconnect reusing the Display should move the cursor onto the new channel."""
+        display_manager = _FakeDisplayManager()
+        closed = _FakeXcbChannel()
+        display_manager.xcb = closed
+        cursor = SoftwareCursor(display_manager=display_manager)
+        window = _FakeWindow()
+        cursor._window = window
+        cursor._visible = True
+        cursor._mapped = True
+        cursor._handles_bind(display_manager.display)
+        cursor.move(10, 10)
+        cursor.flush()
+
+        display_manager.xcb = _FakeXcbChannel()
+        display_manager.reconnect(display_manager.display)
+        cursor.move(20, 30)
+        cursor.flush()
+        cursor.move(30, 40)
+        cursor.flush()
+
+        assert cursor._window is window
+        assert closed.moves == []
+        assert display_manager.xcb.moves == [(window.id, 35, 45, False)]
+        assert display_manager.display.sync_calls == 2
+
+    def test_xcb_move_flushes_queued_hide(self) -> None:
+        """Map/unmap requests on python-xlib should still be flushed on the xcb path."""
+        display_manager = _FakeDisplayManager()
+        display_manager.xcb = _FakeXcbChannel()
+        cursor = SoftwareCursor(display_manager=display_manager)
+        cursor._window = _FakeWindow()
+        cursor._visible = True
+        cursor._mapped = True
+        cursor._handles_bind(display_manager.display)
+
+        cursor.move(10, 10)
+        cursor.flush()
+        cursor.hide()
+        cursor.flush()
+        cursor.show()
+        cursor.move(20, 30)
+        cursor.flush()
+
+        assert display_manager.xcb.moves[-1][3] is True
+        assert display_manager.display.sync_calls == 1
+        assert display_manager.display.flush_calls == 2
+
+
+class TestSoftwareCursorFlush:
+    """Tests for per-tick batching of cursor moves."""
+
+    def test_moves_are_deferred_until_flush(self) -> None:
+        """Moves should not reach the window before flush."""
+        cursor, window = _cursor_build()
+
+        cursor.move(10, 10)
+
+        assert _configures_get(cursor) == []
+
+    def test_flush_sends_only_last_move(self) -> None:
+        """Several moves in one tick should send one configure and one flush."""
+        cursor, window = _cursor_build()
+
+        cursor.move(10, 10)
+        cursor.move(20, 20)
+        cursor.move(30, 40)
+        cursor.flush()
+
+        assert _configures_get(cursor) == [{"x": 35, "y": 45, "stack_mode": X.Above}]
+        assert cursor._display_manager.display.flush_calls == 1
+
+    def test_flush_sends_queued_hide(self) -> None:
+        """A hide with no move in the same tick should still be flushed."""
+        cursor, window = _cursor_build()
+
+        cursor.hide()
+        cursor.flush()
+        cursor.flush()
+
+        assert window.unmap_calls == 1
+        assert _configures_get(cursor) == []
+        assert cursor._display_manager.display.flush_calls == 1
+
+    def test_toggles_within_tick_collapse(self) -> None:
+        """A hide and show before the same flush should send no map or unmap."""
+        cursor, window = _cursor_build()
+
+        cursor.hide()
+        cursor.show()
+        cursor.flush()
+
+        assert window.map_calls == 0
+        assert window.unmap_calls == 0
+        assert cursor._display_manager.display.flush_calls == 0
+
+    def test_flush_without_pending_move_is_noop(self) -> None:
+        """Flushing with nothing pending should not touch the display."""
+        cursor, window = _cursor_build()
+
+        cursor.flush()
+
+        assert _configures_get(cursor) == []
+        assert cursor._display_manager.display.flush_calls == 0
+
+
+class _FakeShapeWindow(_FakeWindow):
+    """Fake window that records mask pixmap creation and shape requests."""
+
+    def __init__(self, created_pixmaps: list[object]) -> None:
+        """Initialize fake shaped window state."""
+        super().__init__()
+        self._created_pixmaps: list[object] = created_pixmaps
+        self.shape_masks: list[object] = []
+        self.shape_rectangles_calls: list[tuple[int, int, list]] = []
+
+    def create_pixmap(self, width: int, height: int, depth: int) -> object:
+        """Create and record a fake pixmap."""
+        pixmap = _FakePixmap()
+        self._created_pixmaps.append(pixmap)
+        return pixmap
+
+    def shape_mask(self, operation: int, destination_kind: int, x: int, y: int, pm: object) -> None:
+        """Record applied shape mask."""
+        self.shape_masks.append(pm)
+
+    def shape_rectangles(
+        self, operation: int, destination_kind: int, ordering: int, x: int, y: int, rects: list
+    ) -> None:
+        """Record applied shape rectangles."""
+        self.shape_rectangles_calls.append((operation, destination_kind, rects))
+
+
+class _FakeGc:
+    """Fake graphics context."""
+
+    def change(self, **kwargs: Any) -> None:
+        """Accept GC attribute changes."""
+
+    def free(self) -> None:
+        """Accept GC release."""
+
+
+class _FakePixmap:
+    """Fake depth-1 pixmap."""
+
+    def create_gc(self, **kwargs: Any) -> _FakeGc:
+        """Return fake graphics context."""
+        return _FakeGc()
+
+    def fill_rectangle(self, *args: Any) -> None:
+        """Accept rectangle fill."""
+
+    def fill_poly(self, *args: Any) -> None:
+        """Accept polygon fill."""
+
+
+class _FakeColormap:
+    """Fake colormap recording color allocations."""
+
+    def __init__(self) -> None:
+        """Initialize fake colormap state."""
+        self.allocations: list[tuple[int, int, int]] = []
+
+    def alloc_color(self, red: int, green: int, blue: int) -> Any:
+        """Record allocation and return fake color with pixel value."""
+        self.allocations.append((red, green, blue))
+        return type("_Color", (), {"pixel": len(self.allocations)})()
+
+
+class _FakeSetupDisplay(_FakeDisplay):
+    """Fake X display able to create shaped cursor windows."""
+
+    def __init__(self, fd: int = 7) -> None:
+        """Initialize fake setup display state."""
+        super().__init__()
+        self._fd: int = fd
+        self.created_pixmaps: list[object] = []
+        self.windows: list[_FakeShapeWindow] = []
+        self.window_attributes: list[dict[str, Any]] = []
+        self.colormap: _FakeColormap = _FakeColormap()
+        root = type("_Root", (), {"create_window": self._window_create})()
+        self._screen = SimpleNamespace(
+            root=root,
+            root_depth=24,
+            default_colormap=self.colormap,
+            root_visual=0x21,
+            allowed_depths=[],
+        )
+
+    def _window_create(self, *args: Any, **kwargs: Any) -> _FakeShapeWindow:
+        """Create and record a fake shaped window."""
+        window = _FakeShapeWindow(self.created_pixmaps)
+        self.windows.append(window)
+        self.window_attributes.append(kwargs)
+        return window
+
+    def screen(self) -> Any:
+        """Return fake screen."""
+        return self._screen
+
+    def has_extension(self, name: str) -> bool:
+        """Report SHAPE availability."""
+        return name == "SHAPE"
+
+    def fileno(self) -> int:
+        """Return fake connection fd."""
+        return self._fd
+
+
+class TestSoftwareCursorShapeCache:
+    """Tests for reuse of the rendered cursor shape mask."""
+
+    def test_cursors_on_same_connection_share_mask(self) -> None:
+        """A second cursor on the same connection should reuse the cached pixmap."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+
+        SoftwareCursor(display_manager=display_manager)._setup()
+        SoftwareCursor(display_manager=display_manager)._setup()
+
+        assert len(display.created_pixmaps) == 1
+        assert display.windows[0].shape_masks == display.windows[1].shape_masks
+
+    def test_new_connection_with_reused_fd_renders_own_mask(self) -> None:
+        """A later connection on the same fd must not get a dead client's pixmap."""
+        display_manager = _FakeDisplayManager()
+        first = _FakeSetupDisplay(fd=9)
+        display_manager.display = first
+        cursor = SoftwareCursor(display_manager=display_manager)
+        cursor._setup()
+
+        second = _FakeSetupDisplay(fd=9)
+        display_manager.reconnect(second)
+        cursor._setup()
+
+        assert len(first.created_pixmaps) == 1
+        assert len(second.created_pixmaps) == 1
+        assert second.windows[0].shape_masks == second.created_pixmaps
+        assert first not in software_cursor_module._SHAPE_CACHE
+        assert first not in software_cursor_module._PIXEL_CACHE
+
+    def test_setup_defers_to_first_flush(self) -> None:
+        """Window creation should not round-trip; the first flush sends it with the move."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+        cursor = SoftwareCursor(display_manager=display_manager)
+
+        cursor.move(10, 10)
+        assert display.sync_calls == 0
+        assert display.flush_calls == 0
+
+        cursor.flush()
+
+        assert display.flush_calls == 1
+        assert len(display.display.requests) == 1
+
+    def test_input_shape_is_cleared(self) -> None:
+        """The cursor window should get an empty input region so clicks pass through."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+
+        SoftwareCursor(display_manager=display_manager)._setup()
+
+        assert display.windows[0].shape_rectangles_calls == [(0, 2, [])]
+
+
+class TestSoftwareCursorColor:
+    """Tests for cursor color allocation."""
+
+    def test_color_allocated_once_per_connection(self) -> None:
+        """Cursors sharing a connection and color should allocate the pixel once."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+
+        SoftwareCursor(display_manager=display_manager, color="green")._setup()
+        SoftwareCursor(display_manager=display_manager, color="green")._setup()
+
+        assert display.colormap.allocations == [(0, 65535, 0)]
+
+    def test_new_connection_allocates_its_own_pixel(self) -> None:
+        """A reconnect should not reuse pixel values cached for the old connection."""
+        display_manager = _FakeDisplayManager()
+        display_manager.display = _FakeSetupDisplay(fd=9)
+        cursor = SoftwareCursor(display_manager=display_manager, color="green")
+        cursor._setup()
+
+        second = _FakeSetupDisplay(fd=9)
+        display_manager.reconnect(second)
+        cursor._setup()
+
+        assert second.colormap.allocations == [(0, 65535, 0)]
+
+    def test_unknown_color_falls_back_to_white(self) -> None:
+        """An unsupported color name should allocate white."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+
+        SoftwareCursor(display_manager=display_manager, color="mauve")._setup()
+
+        assert display.colormap.allocations == [(65535, 65535, 65535)]
+
+    def test_truecolor_pixel_computed_without_allocation(self) -> None:
+        """A TrueColor root visual should yield the pixel from its masks."""
+        display_manager = _FakeDisplayManager()
+        display = _FakeSetupDisplay()
+        display_manager.display = display
+        display.screen().allowed_depths = [
+            SimpleNamespace(
+                visuals=[
+                    SimpleNamespace(
+                        visual_id=0x21,
+                        visual_class=X.TrueColor,
+                        red_mask=0xFF0000,
+                        green_mask=0x00FF00,
+                        blue_mask=0x0000FF,
+                    )
+                ]
+            )
+        ]
+
+        SoftwareCursor(display_manager=display_manager, color="red")._setup()
+
+        assert display.colormap.allocations == []
+        assert display.window_attributes[0]["background_pixel"] == 0xFF0000
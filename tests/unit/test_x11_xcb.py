@@ -0,0 +1,96 @@
+"""Unit tests for the optional libxcb pointer channel."""
+
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from tx2tx.x11 import xcb as xcb_module
+from tx2tx.x11.xcb import XcbPointerChannel
+
+
+class _FakeConnectionException(Exception):
+    """Stand-in for xcffib.ConnectionException."""
+
+
+class _FakeXcbError(Exception):
+    """Stand-in for an xcffib error reply."""
+
+
+class _FakeConnection:
+    """Fake xcffib connection returning scripted poll results."""
+
+    pref_screen: int = 0
+
+    def __init__(self, polls: list[Any]) -> None:
+        """Initialize with scripted poll_for_event results (exceptions are raised)."""
+        self._polls: list[Any] = polls
+        self.poll_calls: int = 0
+
+    def get_setup(self) -> SimpleNamespace:
+        """Return a setup with one root window."""
+        return SimpleNamespace(roots=[SimpleNamespace(root=1)])
+
+    def __call__(self, _key: Any) -> None:
+        """Report no extensions."""
+        raise LookupError("no XTEST")
+
+    def poll_for_event(self) -> Any:
+        """Return or raise the next scripted result, then None."""
+        self.poll_calls += 1
+        if not self._polls:
+            return None
+        result: Any = self._polls.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _channel_build(monkeypatch, polls: list[Any]) -> tuple[XcbPointerChannel, _FakeConnection]:
+    """Build a channel on a fake connection with a fake xcffib module."""
+    monkeypatch.setattr(
+        xcb_module,
+        "xcffib",
+        SimpleNamespace(
+            ConnectionException=_FakeConnectionException, xtest=SimpleNamespace(key=None)
+        ),
+    )
+    connection = _FakeConnection(polls)
+    return XcbPointerChannel(connection), connection
+
+
+class TestXcbErrorsPoll:
+    """Tests for draining error replies of unchecked requests."""
+
+    def test_errors_are_logged_until_queue_is_empty(self, monkeypatch, caplog) -> None:
+        """Every queued error should be read and logged in one poll."""
+        caplog.set_level(logging.WARNING, logger="tx2tx.x11.xcb")
+        channel, connection = _channel_build(monkeypatch, [_FakeXcbError(), _FakeXcbError()])
+
+        assert channel.errors_poll() == 2
+        assert connection.poll_calls == 3
+        assert len(caplog.records) == 2
+
+    def test_poll_is_throttled(self, monkeypatch) -> None:
+        """A second poll inside the interval should not read the connection."""
+        clock_ns: list[int] = [5_000_000_000]
+        monkeypatch.setattr("tx2tx.x11.xcb.time.monotonic_ns", lambda: clock_ns[0])
+        channel, connection = _channel_build(monkeypatch, [])
+
+        channel.errors_poll()
+        channel.errors_poll()
+        assert connection.poll_calls == 1
+
+        clock_ns[0] += 2_000_000_000
+        channel.errors_poll()
+        assert connection.poll_calls == 2
+
+    def test_connection_failure_stops_drain(self, monkeypatch) -> None:
+        """A broken connection should end the drain instead of spinning."""
+        channel, connection = _channel_build(
+            monkeypatch, [_FakeConnectionException(), _FakeXcbError()]
+        )
+
+        assert channel.errors_poll() == 0
+        assert connection.poll_calls == 1
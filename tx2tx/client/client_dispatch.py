@@ -100,6 +100,8 @@ def mouseMessage_handle(
         software_cursor=software_cursor,
     )
     if actual_event is None:
+        # Hidden or off-screen: the local pointer is no longer ours to track
+        injector.pointerState_invalidate()
         return
 
     try:
@@ -440,10 +440,15 @@ def loopStepWithComponents_process(
     """
     messages: list[Message] = network.messages_receive()
     message: Message
-    for message in messages:
-        callbacks.serverMessage_handle(
-            message,
-            event_injector,
-            display_manager,
-            software_cursor,
-        )
+    # Motion received in one read is coalesced and flushed once
+    with event_injector.injections_batch():
+        for message in messages:
+            callbacks.serverMessage_handle(
+                message,
+                event_injector,
+                display_manager,
+                software_cursor,
+            )
+    # Cursor moves from this step go out as one configure and one flush
+    if software_cursor is not None:
+        software_cursor.flush()
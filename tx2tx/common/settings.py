@@ -110,6 +110,26 @@ class Settings:
     away from the edge to prevent immediate boundary re-crossing.
     """
 
+    GRAB_RETRY_ATTEMPTS: int = 5
+    """Attempts at the cursor-confinement pointer grab before failing
+
+    A grab can briefly return AlreadyGrabbed while another client holds the
+    pointer or a button is still down; retrying avoids a hard failure.
+    """
+
+    GRAB_RETRY_DELAY_SEC: float = 0.005
+    """Base backoff between confinement grab attempts (seconds)
+
+    The delay grows linearly with the attempt number.
+    """
+
+    RECORD_EVENT_QUEUE_MAX: int = 1024
+    """Capacity of the XRecord captured-event queue (events)
+
+    If the consumer stalls, motion is dropped first so key and button
+    events survive and memory stays bounded.
+    """
+
     # =========================================================================
     # Client Constants
     # =========================================================================
@@ -121,6 +141,20 @@ class Settings:
     monitoring connection status.
     """
 
+    SOFTWARE_CURSOR_RAISE_INTERVAL_SEC: float = 0.5
+    """Interval between re-raises of the software cursor window (seconds)
+
+    Moves in between only reposition the window; restacking it above its
+    siblings on every sample makes the server recompute the window stack.
+    """
+
+    XCB_ERROR_POLL_INTERVAL_SEC: float = 1.0
+    """Interval between drains of the libxcb companion connection (seconds)
+
+    Requests on that connection are unchecked, so X errors arrive as events;
+    they are read and logged at most this often instead of after every send.
+    """
+
     # =========================================================================
     # Pointer Tracking Constants
     # =========================================================================
@@ -132,6 +166,19 @@ class Settings:
     with timestamps to calculate movement velocity.
     """
 
+    POSITION_HISTORY_EDGE_ZONE_RATIO: float = 0.15
+    """Width of the full-rate sampling zone along each edge (fraction of screen)
+
+    Pointer samples inside this band are always added to the velocity history.
+    """
+
+    POSITION_HISTORY_INTERIOR_STRIDE: int = 4
+    """Record every Nth pointer sample away from the screen edges
+
+    Velocity only matters near a boundary; the interior keeps a sparser
+    history, which velocity_calculate handles through its per-step deltas.
+    """
+
     MIN_SAMPLES_FOR_VELOCITY: int = 2
     """Minimum position samples needed to calculate velocity
 
@@ -36,7 +36,7 @@ class ScreenContext(Enum):
     SOUTH = "south"  # South client has control, cursor hidden
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Position:
     """Absolute pixel position on a screen"""
 
@@ -71,7 +71,7 @@ class Position:
         return self.bounds_check(width, height)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NormalizedPoint:
     """Normalized coordinates in 0.0-1.0 range
 
@@ -103,7 +103,7 @@ class NormalizedPoint:
             )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Screen:
     """A display screen with dimensions and coordinate space
 
@@ -193,7 +193,7 @@ class Screen:
 ScreenGeometry = Screen
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MouseEvent:
     """Mouse event data
 
@@ -237,7 +237,7 @@ class MouseEvent:
         return self.event_type in (EventType.MOUSE_BUTTON_PRESS, EventType.MOUSE_BUTTON_RELEASE)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class KeyEvent:
     """Keyboard event data"""
 
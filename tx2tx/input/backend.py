@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from typing import Protocol
+import contextlib
+from typing import ContextManager, Protocol
 
 from tx2tx.common.types import KeyEvent, MouseEvent, Position, Screen
 
@@ -48,6 +49,20 @@ class DisplayBackend(Protocol):
         """
         """Flush and sync backend connection."""
 
+    def requests_batch(self) -> ContextManager[None]:
+        """
+        Group backend requests behind one final sync.
+        
+        Backends without request batching use a no-op context.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        return contextlib.nullcontext()
+
     def screenGeometry_get(self) -> Screen:
         """
         Get display geometry.
@@ -223,3 +238,30 @@ class InputInjector(Protocol):
             Result value.
         """
         """Inject keyboard event."""
+
+    def injections_batch(self) -> ContextManager[None]:
+        """
+        Group injected events behind one final flush.
+        
+        Injectors that can coalesce pointer motion keep only the latest move
+        inside the block. Injectors without batching use a no-op context.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        return contextlib.nullcontext()
+
+    def pointerState_invalidate(self) -> None:
+        """
+        Forget any cached pointer position after the pointer left our control.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        return None
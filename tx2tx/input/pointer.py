@@ -2,7 +2,7 @@
 
 import logging
 import time
-from collections import deque
+from array import array
 from typing import Optional
 
 from tx2tx.common.settings import settings
@@ -12,6 +12,28 @@ from tx2tx.input.backend import DisplayBackend
 logger = logging.getLogger(__name__)
 
 
+def _boundaryDirectionLut_build() -> tuple[Direction | None, ...]:
+    # Index bits: 1=left, 2=right, 4=top, 8=bottom. Corners resolve in the
+    # same left, right, top, bottom priority as the branch version.
+    lut: list[Direction | None] = []
+    for code in range(16):
+        direction: Direction | None = None
+        for bit, candidate in (
+            (1, Direction.LEFT),
+            (2, Direction.RIGHT),
+            (4, Direction.TOP),
+            (8, Direction.BOTTOM),
+        ):
+            if code & bit:
+                direction = candidate
+                break
+        lut.append(direction)
+    return tuple(lut)
+
+
+_BOUNDARY_DIRECTION_LUT: tuple[Direction | None, ...] = _boundaryDirectionLut_build()
+
+
 class PointerTracker:
     """Tracks pointer position and detects screen boundary crossings."""
 
@@ -20,6 +42,7 @@ class PointerTracker:
         display_manager: DisplayBackend,
         edge_threshold: int = 0,
         velocity_threshold: float | None = None,
+        track_velocity: bool = True,
     ) -> None:
         self._display_manager: DisplayBackend = display_manager
         self._edge_threshold: int = edge_threshold
@@ -29,66 +52,175 @@ class PointerTracker:
             else settings.DEFAULT_VELOCITY_THRESHOLD
         )
         self._last_position: Optional[Position] = None
-        self._position_history: deque[tuple[Position, float]] = deque(
-            maxlen=settings.POSITION_HISTORY_SIZE
-        )
+        # Without velocity consumers no samples or timestamps are recorded
+        self._track_velocity: bool = track_velocity
+        # Ring buffer of recent samples: x, y and monotonic timestamp (ns)
+        history_size: int = settings.POSITION_HISTORY_SIZE
+        self._history_size: int = history_size
+        self._history_x: array = array("i", [0] * history_size)
+        self._history_y: array = array("i", [0] * history_size)
+        self._history_ns: array = array("q", [0] * history_size)
+        # Velocity (px/s) of the leg ending at each sample, computed when the
+        # sample is recorded; -1.0 marks a leg with no usable time delta
+        self._history_step: array = array("d", [-1.0] * history_size)
+        self._history_head: int = 0
+        self._history_count: int = 0
         self._edge_contact_direction: Direction | None = None
-        self._edge_contact_started_at: float = 0.0
+        self._edge_contact_started_ns: int = 0
+        self._edge_dwell_ns: int = int(settings.EDGE_DWELL_SECONDS * 1_000_000_000)
         self._edge_contact_samples: int = 0
+        # Right/bottom edge coordinates for the last geometry seen
+        self._edge_geometry: ScreenGeometry | None = None
+        self._edge_right: int = 0
+        self._edge_bottom: int = 0
+        # Interior rectangle (exclusive) where history is only sampled every
+        # POSITION_HISTORY_INTERIOR_STRIDE queries; empty until geometry is known
+        self._interior_left: int = 0
+        self._interior_right: int = 0
+        self._interior_top: int = 0
+        self._interior_bottom: int = 0
+        self._interior_skipped: int = 0
+        # Monotonic time stamped by tick() once per loop iteration; 0 until
+        # the first tick, in which case the clock is read directly
+        self._now_ns: int = 0
+
+    def tick(self, now_ns: int | None = None) -> None:
+        if not self._track_velocity:
+            # Nothing is sampled; edge dwell reads the clock itself, and only
+            # while the pointer is at an edge
+            return
+        self._now_ns = now_ns if now_ns is not None else time.monotonic_ns()
+
+    def _clock_ns(self) -> int:
+        return self._now_ns or time.monotonic_ns()
 
     def position_query(self) -> Position:
         position = self._display_manager.pointerPosition_get()
         self._last_position = position
-        self._position_history.append((position, time.time()))
+        if not self._track_velocity:
+            return position
+        x: int = position.x
+        y: int = position.y
+        if (
+            self._interior_left < x < self._interior_right
+            and self._interior_top < y < self._interior_bottom
+        ):
+            self._interior_skipped += 1
+            if self._interior_skipped < settings.POSITION_HISTORY_INTERIOR_STRIDE:
+                return position
+        self._interior_skipped = 0
+        self._sample_record(x, y, self._clock_ns())
         return position
 
+    def _sample_record(self, x: int, y: int, timestamp_ns: int) -> None:
+        head: int = self._history_head
+        step_velocity: float = -1.0
+        if self._history_count:
+            previous: int = (head - 1) % self._history_size
+            time_delta_ns: int = timestamp_ns - self._history_ns[previous]
+            if time_delta_ns > 0:
+                distance: int = abs(x - self._history_x[previous]) + abs(
+                    y - self._history_y[previous]
+                )
+                step_velocity = distance * 1_000_000_000 / time_delta_ns
+        self._history_step[head] = step_velocity
+        self._history_x[head] = x
+        self._history_y[head] = y
+        self._history_ns[head] = timestamp_ns
+        self._history_head = (head + 1) % self._history_size
+        if self._history_count < self._history_size:
+            self._history_count += 1
+
     def velocity_calculate(self) -> float:
-        if len(self._position_history) < settings.MIN_SAMPLES_FOR_VELOCITY:
+        # Median of per-step velocities (px/s) over the window: one jittered
+        # or jumped sample skews a single step rather than the estimate.
+        count: int = self._history_count
+        if count < settings.MIN_SAMPLES_FOR_VELOCITY:
             return 0.0
 
-        oldest_pos, oldest_time = self._position_history[0]
-        newest_pos, newest_time = self._position_history[-1]
-        time_delta = newest_time - oldest_time
-        if time_delta <= 0:
+        # Step velocities are kept up to date by _sample_record; the oldest
+        # sample's leg starts outside the window and is left out
+        size: int = self._history_size
+        steps: array = self._history_step
+        head: int = self._history_head
+        step_velocities: list[float] = [
+            velocity
+            for velocity in (steps[(head - offset) % size] for offset in range(1, count))
+            if velocity >= 0.0
+        ]
+        if not step_velocities:
             return 0.0
 
-        distance = abs(newest_pos.x - oldest_pos.x) + abs(newest_pos.y - oldest_pos.y)
-        return distance / time_delta
+        step_velocities.sort()
+        middle: int = len(step_velocities) // 2
+        if len(step_velocities) % 2:
+            return step_velocities[middle]
+        return (step_velocities[middle - 1] + step_velocities[middle]) / 2
+
+    def geometry_set(self, geometry: ScreenGeometry) -> None:
+        # Edge limits and the interior sampling zone depend only on geometry;
+        # boundary_detect rebinds them if it is handed a different one
+        self._edge_geometry = geometry
+        self._edge_right = geometry.width - 1
+        self._edge_bottom = geometry.height - 1
+        margin_x: int = int(geometry.width * settings.POSITION_HISTORY_EDGE_ZONE_RATIO)
+        margin_y: int = int(geometry.height * settings.POSITION_HISTORY_EDGE_ZONE_RATIO)
+        self._interior_left = margin_x
+        self._interior_right = geometry.width - 1 - margin_x
+        self._interior_top = margin_y
+        self._interior_bottom = geometry.height - 1 - margin_y
 
     def boundary_detect(
         self, position: Position, geometry: ScreenGeometry
     ) -> Optional[ScreenTransition]:
-        direction: Direction | None = self.boundaryDirectionFromPosition_get(position, geometry)
+        if geometry is not self._edge_geometry:
+            self.geometry_set(geometry)
+        x: int = position.x
+        y: int = position.y
+        right: int = self._edge_right
+        bottom: int = self._edge_bottom
+        # Almost every sample is away from the edges: one combined test
+        if 0 < x < right and 0 < y < bottom:
+            if self._edge_contact_direction is not None:
+                self._edgeContact_reset()
+            return None
+
+        direction: Direction | None = _BOUNDARY_DIRECTION_LUT[
+            (x <= 0) | ((x >= right) << 1) | ((y <= 0) << 2) | ((y >= bottom) << 3)
+        ]
         if direction is None:
             self._edgeContact_reset()
             return None
 
         self._edgeContact_update(direction)
         if not self._edgeContactConfirmed_check():
-            logger.debug(
-                "Boundary %s seen but awaiting confirmation (%s/%s)",
-                direction.value,
-                self._edge_contact_samples,
-                settings.EDGE_CONFIRMATION_SAMPLES,
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Boundary %s seen but awaiting confirmation (%s/%s)",
+                    direction.value,
+                    self._edge_contact_samples,
+                    settings.EDGE_CONFIRMATION_SAMPLES,
+                )
             return None
         if not self._edgeContactDwellElapsed_check():
-            logger.debug(
-                "Boundary %s confirmed but awaiting dwell %.3fs/%.3fs",
-                direction.value,
-                self._edgeContactElapsed_seconds(),
-                settings.EDGE_DWELL_SECONDS,
-            )
+            # The elapsed time argument costs a clock read; only pay it when
+            # the message will be emitted
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Boundary %s confirmed but awaiting dwell %.3fs/%.3fs",
+                    direction.value,
+                    self._edgeContactElapsed_seconds(),
+                    settings.EDGE_DWELL_SECONDS,
+                )
             return None
         transition: ScreenTransition = ScreenTransition(direction=direction, position=position)
         self._edgeContact_reset()
         return transition
 
     def _edgeContact_update(self, direction: Direction) -> None:
-        now: float = time.time()
         if self._edge_contact_direction != direction:
             self._edge_contact_direction = direction
-            self._edge_contact_started_at = now
+            self._edge_contact_started_ns = self._clock_ns()
             self._edge_contact_samples = 1
             return
         self._edge_contact_samples += 1
@@ -96,35 +228,46 @@ class PointerTracker:
     def _edgeContactConfirmed_check(self) -> bool:
         return self._edge_contact_samples >= settings.EDGE_CONFIRMATION_SAMPLES
 
+    def _edgeContactElapsed_ns(self) -> int:
+        if self._edge_contact_started_ns == 0:
+            return 0
+        return self._clock_ns() - self._edge_contact_started_ns
+
     def _edgeContactElapsed_seconds(self) -> float:
-        if self._edge_contact_started_at <= 0.0:
-            return 0.0
-        return time.time() - self._edge_contact_started_at
+        return self._edgeContactElapsed_ns() / 1_000_000_000
 
     def _edgeContactDwellElapsed_check(self) -> bool:
-        return self._edgeContactElapsed_seconds() >= settings.EDGE_DWELL_SECONDS
+        return self._edgeContactElapsed_ns() >= self._edge_dwell_ns
 
     def _edgeContact_reset(self) -> None:
         self._edge_contact_direction = None
-        self._edge_contact_started_at = 0.0
+        self._edge_contact_started_ns = 0
         self._edge_contact_samples = 0
 
     @staticmethod
     def boundaryDirectionFromPosition_get(
         position: Position, geometry: ScreenGeometry
     ) -> Direction | None:
-        if position.x <= 0:
+        x: int = position.x
+        y: int = position.y
+        max_x: int = geometry.width - 1
+        max_y: int = geometry.height - 1
+        if 0 < x < max_x and 0 < y < max_y:
+            return None
+        if x <= 0:
             return Direction.LEFT
-        if position.x >= geometry.width - 1:
+        if x >= max_x:
             return Direction.RIGHT
-        if position.y <= 0:
+        if y <= 0:
             return Direction.TOP
-        if position.y >= geometry.height - 1:
+        if y >= max_y:
             return Direction.BOTTOM
         return None
 
     def reset(self) -> None:
-        self._position_history.clear()
+        self._history_head = 0
+        self._history_count = 0
+        self._interior_skipped = 0
         self._last_position = None
         self._edgeContact_reset()
 
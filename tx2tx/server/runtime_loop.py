@@ -14,6 +14,7 @@ Design goals:
 
 from __future__ import annotations
 
+import logging
 import time
 from dataclasses import dataclass
 from typing import Literal, Protocol
@@ -70,6 +71,10 @@ class LoggerProtocol(Protocol):
         """Emit warning-level message."""
         ...
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Return True when messages at `level` would be emitted."""
+        ...
+
 
 class ClientMessageHandleProtocol(Protocol):
     """Callback contract for handling one inbound client message."""
@@ -348,6 +353,8 @@ def pointerState_sample(deps: PollingLoopDependencies) -> tuple[Position, float]
     Returns:
         Tuple of sampled `(position, velocity)`.
     """
+    # One clock read per iteration, shared by sampling and edge-dwell timing
+    deps.pointer_tracker.tick()
     position: Position = deps.pointer_tracker.position_query()
     velocity: float = deps.pointer_tracker.velocity_calculate()
     return position, velocity
@@ -377,6 +384,11 @@ def pointerTelemetry_log(
     """
     global _LAST_POS_LOG_TIME
 
+    # Both messages are debug-level; skip the clock read and edge test
+    # on every sample when they would be dropped anyway
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
     now: float = time.time()
     if (now - _LAST_POS_LOG_TIME) >= 0.5:
         logger.debug(
@@ -224,6 +224,7 @@ def runtimeResources_initialize(
         config=config,
         logger=logger,
     )
+    pointer_tracker.geometry_set(screen_geometry)
     clientPosition_validate(config, logger)
 
     network: ServerNetwork = ServerNetwork(
@@ -387,6 +388,8 @@ def pointerTracker_initialize(
         display_manager=display_manager,
         edge_threshold=config.server.edge_threshold,
         velocity_threshold=config.server.velocity_threshold,
+        # A non-positive threshold always passes, so velocity is never needed
+        track_velocity=config.server.velocity_threshold > 0,
     )
     logger.info(
         "Pointer tracker initialized (velocity_threshold=%s)",
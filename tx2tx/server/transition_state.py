@@ -389,10 +389,12 @@ def remoteContextEnter_process(
         target_context.value,
     )
 
-    display_manager.cursorPosition_set(warp_pos)
-    display_manager.keyboard_grab()
-    display_manager.pointer_grab()
-    display_manager.cursor_hide()
+    # One round-trip for the whole switch instead of one per step
+    with display_manager.requests_batch():
+        display_manager.cursorPosition_set(warp_pos)
+        display_manager.keyboard_grab()
+        display_manager.pointer_grab()
+        display_manager.cursor_hide()
 
     pointer_tracker.reset()
     server_state.last_sent_position = None
@@ -667,9 +669,10 @@ def _transitionFailure_recover(
             Runtime logger.
     """
     try:
-        display_manager.keyboard_ungrab()
-        display_manager.pointer_ungrab()
-        display_manager.cursor_show()
+        with display_manager.requests_batch():
+            display_manager.keyboard_ungrab()
+            display_manager.pointer_ungrab()
+            display_manager.cursor_show()
     except Exception:
         pass
     server_state.context = ScreenContext.CENTER
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import ContextManager, Optional
 
 from Xlib import X
 
@@ -77,6 +77,18 @@ class X11DisplayBackend(DisplayBackend):
         """Flush and synchronize the X11 connection."""
         self._display_manager.connection_sync()
 
+    def requests_batch(self) -> ContextManager[None]:
+        """
+        Group X11 requests behind one final sync.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        return self._display_manager.requests_batch()
+
     def screenGeometry_get(self) -> Screen:
         """
         Return screen geometry for the X11 display.
@@ -355,3 +367,27 @@ class X11InputInjector(InputInjector):
         """
         """Inject a key event via X11 XTest."""
         self._injector.keyEvent_inject(event)
+
+    def injections_batch(self) -> ContextManager[None]:
+        """
+        Coalesce pointer motion and flush once for a group of events.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        return self._injector.injections_batch()
+
+    def pointerState_invalidate(self) -> None:
+        """
+        Forget the last injected motion after the pointer left our control.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        self._injector.pointerState_invalidate()
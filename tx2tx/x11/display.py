@@ -1,15 +1,24 @@
 """X11 display connection and management"""
 
+import contextlib
 import ctypes
+import functools
 import logging
 import os
+import select
+import socket
+import threading
 import time
-from typing import Optional
+import weakref
+from typing import Callable, Iterator, Optional
 from Xlib import display as xdisplay, X
 from Xlib.display import Display
-from Xlib.ext import xtest
+from Xlib.protocol import request as xrequest
 
+from tx2tx.common.settings import settings
 from tx2tx.common.types import Position, ScreenGeometry
+from tx2tx.x11 import wire
+from tx2tx.x11.xcb import XcbPointerChannel
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +32,7 @@ try:
     _xfixes_display_ptr = None
     _xfixes_root_window = None
 except OSError as e:
-    logger.warning(f"Failed to load native XFixes library: {e}")
+    logger.warning("Failed to load native XFixes library: %s", e)
     libX11 = None
     libXfixes = None
     XFIXES_AVAILABLE = False
@@ -73,7 +82,7 @@ def xfixes_hide_cursor_native(display: Display, window_id: int) -> bool:
 
         return True
     except Exception as e:
-        logger.debug(f"Native XFixesHideCursor failed: {e}")
+        logger.debug("Native XFixesHideCursor failed: %s", e)
         return False
 
 
@@ -105,14 +114,18 @@ def xfixes_show_cursor_native(display: Display, window_id: int) -> bool:
 
         return True
     except Exception as e:
-        logger.debug(f"Native XFixesShowCursor failed: {e}")
+        logger.debug("Native XFixesShowCursor failed: %s", e)
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def is_native_x11() -> bool:
     """
     Detect if running on native X11 vs Wayland/Crostini compositor.
     
+    The session environment does not change mid-run, so the probe is
+    evaluated once and memoized.
+    
     Args:
         None.
     
@@ -140,6 +153,102 @@ def is_native_x11() -> bool:
     # Default: assume native X11 if DISPLAY is set without Wayland indicators
     return "DISPLAY" in os.environ
 
+
+# python-xlib passes None for an absent protocol/host; "" and False are
+# treated the same. A bare or "unix" host means a local display.
+_UNSET_VALUES = frozenset({None, "", False})
+_LOCAL_HOSTS = frozenset({None, "", False, "unix"})
+_unix_socket_patched: bool = False
+
+
+def _unixSocketCandidates_get(dno: int) -> list[str]:
+    """
+    List existing X11 UNIX socket paths for a display number, in priority order.
+    
+    Termux keeps the socket under $PREFIX/tmp and some sandboxes under
+    $TMPDIR or $XDG_RUNTIME_DIR; /tmp is the conventional location.
+    
+    Args:
+        dno: X11 display number.
+    
+    Returns:
+        Existing socket paths.
+    """
+    socket_name: str = f".X11-unix/X{dno}"
+    directories: list[str] = []
+    for env_name, suffix in (("XDG_RUNTIME_DIR", ""), ("TMPDIR", ""), ("PREFIX", "/tmp")):
+        value: str = os.environ.get(env_name, "")
+        if value:
+            directories.append(value + suffix)
+    directories.append("/tmp")
+    candidates: list[str] = []
+    for directory in directories:
+        path: str = os.path.join(directory, socket_name)
+        if path not in candidates and os.path.exists(path):
+            candidates.append(path)
+    return candidates
+
+
+def _unixSocketPatch_install() -> None:
+    """
+    Teach python-xlib to connect local displays straight to a UNIX socket.
+    
+    PyPI's python-xlib only looks in /tmp/.X11-unix/ and, for a bare ":N"
+    display, falls back to TCP when that fails. Termux has the socket at
+    $PREFIX/tmp/.X11-unix/ instead. The patch checks the known socket
+    directories first and is installed once at module import rather than on
+    every connection_establish.
+    
+    Args:
+        None.
+    
+    Returns:
+        Result value.
+    """
+    global _unix_socket_patched
+    if _unix_socket_patched:
+        return
+    try:
+        from Xlib.support import unix_connect
+    except ImportError:
+        return  # Not an issue if module structure is different
+
+    original_get_socket = getattr(unix_connect, "get_socket", None)
+    if original_get_socket is None:
+        return
+
+    def _unix_get_socket(dname: str, protocol: object, host: object, dno: int) -> object:
+        """
+        Socket locator that tries known UNIX socket paths before python-xlib
+        
+        Args:
+            dname: dname value.
+            protocol: protocol value.
+            host: host value.
+            dno: dno value.
+        
+        Returns:
+            Result value.
+        """
+        if protocol == "unix" or (protocol in _UNSET_VALUES and host in _LOCAL_HOSTS):
+            for address in _unixSocketCandidates_get(dno):
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    s.connect(address)
+                except OSError:
+                    s.close()
+                    continue
+                return s
+        # TCP displays, or no socket file found: python-xlib's own lookup
+        return original_get_socket(dname, protocol, host, dno)
+
+    unix_connect.get_socket = _unix_get_socket
+    _unix_socket_patched = True
+
+
+_unixSocketPatch_install()
+
+
 # X11 cursor font constants (from X11/cursorfont.h)
 # Each cursor shape has an even number; the mask is shape + 1
 XC_X_CURSOR = 0  # X shape
@@ -149,6 +258,112 @@ XC_TCROSS = 130  # Thin cross
 XC_PIRATE = 88  # Skull and crossbones
 
 
+# Shared python-xlib connections keyed by display name, with a reference
+# count. Opening a Display costs a connection handshake and setup parse, so
+# DisplayManagers on the same display reuse one connection.
+_display_pool: dict[Optional[str], tuple[Display, int]] = {}
+_display_pool_lock = threading.Lock()
+
+
+def _displaySocket_tune(display: Display) -> None:
+    """
+    Disable Nagle on TCP X11 connections.
+
+    Warps and fake motion are small requests; with Nagle the kernel can hold
+    one back for up to an ACK delay. UNIX sockets are left untouched.
+
+    Args:
+        display: Newly opened display.
+
+    Returns:
+        None.
+    """
+    try:
+        sock = display.display.socket
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except (AttributeError, OSError) as exc:
+        logger.debug("Could not set TCP_NODELAY on X11 socket: %r", exc)
+
+
+def _pooledDisplay_acquire(display_name: Optional[str]) -> Display:
+    """
+    Return the shared Display for display_name, opening it on first use.
+
+    Args:
+        display_name: X11 display name, or None for ``$DISPLAY``.
+
+    Returns:
+        Shared Display connection.
+    """
+    with _display_pool_lock:
+        entry = _display_pool.get(display_name)
+        if entry is None:
+            display = xdisplay.Display(display_name)
+            _displaySocket_tune(display)
+            _display_pool[display_name] = (display, 1)
+            return display
+        display, refcount = entry
+        _display_pool[display_name] = (display, refcount + 1)
+        return display
+
+
+def _pooledDisplay_release(display_name: Optional[str]) -> None:
+    """
+    Drop one reference to the shared Display, closing it on the last release.
+
+    Args:
+        display_name: X11 display name used to acquire the connection.
+
+    Returns:
+        None.
+    """
+    with _display_pool_lock:
+        entry = _display_pool.get(display_name)
+        if entry is None:
+            return
+        display, refcount = entry
+        if refcount > 1:
+            _display_pool[display_name] = (display, refcount - 1)
+            return
+        del _display_pool[display_name]
+    display.close()
+
+
+def _displayManager_finalize(
+    display_name: Optional[str], xcb: Optional[XcbPointerChannel]
+) -> None:
+    """
+    Release connections of a DisplayManager dropped without connection_close.
+
+    Must not reference the manager itself, or it would never be collected.
+
+    Args:
+        display_name: Display name the pooled connection was acquired for.
+        xcb: Companion xcb channel, if one was opened.
+
+    Returns:
+        None.
+    """
+    if xcb is not None:
+        xcb.close()
+    try:
+        _pooledDisplay_release(display_name)
+    except Exception:
+        pass
+
+
+# Pointer events requested by both the capture grab and the confinement grab
+_POINTER_EVENT_MASK: int = X.PointerMotionMask | X.ButtonPressMask | X.ButtonReleaseMask
+
+
+# Events a grab generates on our own connection that no reader consumes.
+# Input events (keys, buttons, motion) are left for the input capturer.
+_GRAB_NOISE_EVENTS = frozenset(
+    {X.FocusIn, X.FocusOut, X.EnterNotify, X.LeaveNotify, X.KeymapNotify}
+)
+
+
 class DisplayManager:
     """Manages X11 display connection and screen information"""
 
@@ -173,12 +388,43 @@ class DisplayManager:
         self._display_name: Optional[str] = display_name
         self._overlay_enabled: bool = overlay_enabled
         self._x11native: bool = x11native
+        self._native_x11: bool = x11native or is_native_x11()
         self._cursor_confined: bool = False
         self._original_position: Optional[Position] = None
         self._cursor_hidden: bool = False
         self._blank_cursor: Optional[int] = None
         self._remote_cursor: Optional[int] = None  # Gray X cursor for remote mode
         self._cursor_overlay_window = None  # Fullscreen overlay for cursor display
+        self._xcb: Optional[XcbPointerChannel] = None  # Optional libxcb warp fast path
+        self._finalizer: Optional[weakref.finalize] = None  # Releases leaked connections
+        # Per-connection handles, cached once in connection_establish
+        self._screen = None
+        self._root = None
+        self._has_xfixes: bool = False
+        self._has_xtest: bool = False
+        self._warp_prefix: bytes = b""  # Encoded WarpPointer up to dst_x
+        self._xtest_opcode: int = 0  # XTEST major opcode, 0 when absent
+        self._cursor_hide_methods: tuple[Callable[[], bool], ...] = ()
+        self._cursor_hide_method: Optional[Callable[[], bool]] = None  # last that worked
+        self._in_batch: bool = False  # True inside requests_batch()
+        # python-xlib request serial when it last completed a round-trip;
+        # while unchanged, nothing is queued there that xcb could overtake
+        self._xlib_idle_serial: int = -1
+        self._pointer_via_xcb: bool = False  # Connection of the last warp/motion
+        # Called after every connect and disconnect so holders of cached
+        # connection handles can drop them
+        self._connection_listeners: list[Callable[[], None]] = []
+        # cursorPosition_set(position): move the cursor to an absolute position
+        # with the method suited to the session. Native X11 honours
+        # WarpPointer; Crostini/Wayland-like sessions ignore it, so XTest fake
+        # motion is used there. The session type never changes, so the method
+        # is bound once here. The request is flushed, not synced; callers that
+        # need completion use cursorPosition_setAndVerify or connection_sync.
+        self.cursorPosition_set: Callable[[Position], None] = (
+            self.cursorPosition_setViaWarpPointer
+            if self._native_x11
+            else self.cursorPosition_setViaXTest
+        )
 
     def connection_establish(self) -> None:
         """
@@ -190,51 +436,53 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        """Establish connection to X11 display"""
-        # Termux workaround: Monkey-patch python-xlib to find X11 socket in PREFIX/tmp
-        # PyPI's python-xlib hardcodes /tmp/.X11-unix/, but termux has it at $PREFIX/tmp/.X11-unix/
-        if "PREFIX" in os.environ:
+        self._display = _pooledDisplay_acquire(self._display_name)
+        self._screen = self._display.screen()
+        self._root = self._screen.root
+        self._has_xfixes = self._display.has_extension("XFIXES")
+        self._has_xtest = self._display.has_extension("XTEST")
+        self._warp_prefix = wire.warpPointerPrefix_pack(self._root.id)
+        if self._has_xtest:
+            self._xtest_opcode = self._display.get_extension_major("XTEST")
+        self._xcb = XcbPointerChannel.channel_open(self._display_name)
+        self._finalizer = weakref.finalize(
+            self, _displayManager_finalize, self._display_name, self._xcb
+        )
+
+        # Build cursors up front so the first hide/grab on a mode switch does
+        # not pay the pixmap and cursor-font requests
+        self._ensure_blank_cursor()
+        self._remoteCursor_create()
+        self._cursor_hide_methods = self._cursorHideMethods_resolve()
+        self._connectionListeners_notify()
+
+    def connectionListener_add(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback run after the connection is established or closed.
+        
+        Args:
+            listener: Zero-argument callable; typically drops cached handles.
+        
+        Returns:
+            None.
+        """
+        self._connection_listeners.append(listener)
+
+    def _connectionListeners_notify(self) -> None:
+        """
+        Tell registered listeners that the connection changed.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        for listener in self._connection_listeners:
             try:
-                from Xlib.support import unix_connect
-                import socket as socket_module
-
-                # Patch get_socket to use termux path
-                original_get_socket = unix_connect.get_socket
-
-                def _termux_get_socket(
-                    dname: str, protocol: object, host: object, dno: int
-                ) -> object:
-                    """
-                    Termux-specific socket locator that checks PREFIX/tmp before /tmp
-                    
-                    Args:
-                        dname: dname value.
-                        protocol: protocol value.
-                        host: host value.
-                        dno: dno value.
-                    
-                    Returns:
-                        Result value.
-                    """
-                    """Termux-specific socket locator that checks PREFIX/tmp before /tmp"""
-                    # For unix sockets, check termux location first
-                    if protocol == "unix" or (not protocol and (not host or host == "unix")):
-                        termux_address = f"{os.environ['PREFIX']}/tmp/.X11-unix/X{dno}"
-                        if os.path.exists(termux_address):
-                            # Connect directly to termux socket
-                            s = socket_module.socket(
-                                socket_module.AF_UNIX, socket_module.SOCK_STREAM
-                            )
-                            s.connect(termux_address)
-                            return s
-                    # Fall back to original implementation
-                    return original_get_socket(dname, protocol, host, dno)
-
-                unix_connect.get_socket = _termux_get_socket
-            except (ImportError, AttributeError):
-                pass  # Not an issue if module structure is different
-
-        self._display = xdisplay.Display(self._display_name)
+                listener()
+            except Exception as exc:
+                logger.warning("Connection listener failed: %r", exc)
 
     def connection_close(self) -> None:
         """
@@ -247,9 +495,57 @@ class DisplayManager:
             Result value.
         """
         """Close X11 display connection"""
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        if self._xcb is not None:
+            self._xcb.close()
+            self._xcb = None
+        self._pointer_via_xcb = False
         if self._display is not None:
-            self._display.close()
+            # The pooled connection may outlive this manager, so free our cursors
+            # and the overlay window
+            self._cursors_free()
+            _pooledDisplay_release(self._display_name)
             self._display = None
+            self._screen = None
+            self._root = None
+            self._has_xfixes = False
+            self._has_xtest = False
+            self._xtest_opcode = 0
+            self._blank_cursor = None
+            self._remote_cursor = None
+            self._cursor_hide_methods = ()
+            self._cursor_hide_method = None
+            self._connectionListeners_notify()
+
+    def _cursors_free(self) -> None:
+        """
+        Free the blank and remote cursors on the server, best effort.
+        
+        The cursor overlay window uses the remote cursor, so it is destroyed
+        first.
+        
+        Args:
+            None.
+        
+        Returns:
+            Result value.
+        """
+        if self._cursor_overlay_window is not None:
+            try:
+                self._cursor_overlay_window.destroy()
+            except Exception:
+                pass
+            self._cursor_overlay_window = None
+        for cursor in (self._blank_cursor, self._remote_cursor):
+            if cursor:
+                try:
+                    cursor.free()
+                except Exception:
+                    pass
+        self._blank_cursor = None
+        self._remote_cursor = None
 
     def display_get(self) -> Display:
         """
@@ -265,6 +561,18 @@ class DisplayManager:
             raise RuntimeError("Not connected to X11 display")
         return self._display
 
+    def xcbChannel_get(self) -> Optional[XcbPointerChannel]:
+        """
+        Get the companion libxcb channel, if one is open
+        
+        Args:
+            None.
+        
+        Returns:
+            Open channel, or None when xcffib is unavailable.
+        """
+        return self._xcb
+
     def screenGeometry_get(self) -> ScreenGeometry:
         """
         Get screen geometry (dimensions)
@@ -275,10 +583,8 @@ class DisplayManager:
         Returns:
             Screen geometry.
         """
-        display = self.display_get()
-        screen = display.screen()
-        root = screen.root
-        geom = root.get_geometry()
+        self.display_get()
+        geom = self._root.get_geometry()
 
         return ScreenGeometry(width=geom.width, height=geom.height)
 
@@ -329,31 +635,37 @@ class DisplayManager:
             return  # Already confined
 
         display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        root = self._root
 
-        # Store current position for restoration
+        # Drop any grab we already hold so the confinement grab replaces it,
+        # then send the grab without waiting. This prevents the physical
+        # mouse from moving the cursor.
+        display.ungrab_pointer(X.CurrentTime)
+        grab_cookie = self._pointerGrab_send(root, 0)  # confine_to root
+
+        # Store current position for restoration. Replies arrive in order, so
+        # this one round-trip also collects the grab reply.
         pointer_data = root.query_pointer()
+        self._xlibIdle_mark(display)
         self._original_position = Position(x=pointer_data.root_x, y=pointer_data.root_y)
 
         # Move cursor to confinement position (uses warp_pointer on native X11, XTest on Crostini)
-        self.cursorPosition_set(position)
+        self._cursorPosition_enforce(position)
 
-        # Grab pointer to confine it
-        # This prevents the physical mouse from moving the cursor
-        result = root.grab_pointer(
-            True,  # owner_events
-            X.PointerMotionMask | X.ButtonPressMask | X.ButtonReleaseMask,
-            X.GrabModeAsync,
-            X.GrabModeAsync,
-            root,  # confine_to
-            0,  # cursor
-            X.CurrentTime,
-        )
+        grab_cookie.reply()
+        result: int = grab_cookie.status
+
+        # AlreadyGrabbed (another client, or a held button) is usually
+        # transient, so retry briefly before failing.
+        for attempt in range(1, settings.GRAB_RETRY_ATTEMPTS):
+            if result == 0:  # GrabSuccess
+                break
+            time.sleep(settings.GRAB_RETRY_DELAY_SEC * attempt)
+            result = self._pointerGrab_request(root, 0)
 
-        if result == 0:  # GrabSuccess
+        if result == 0:  # GrabSuccess (the grab reply already round-tripped)
             self._cursor_confined = True
-            display.sync()
+            self._grabNoise_drain()
         else:
             raise RuntimeError(f"Failed to confine cursor: grab result {result}")
 
@@ -372,43 +684,37 @@ class DisplayManager:
 
         display = self.display_get()
 
-        # Release pointer grab
+        # Release pointer grab; the ungrab is one-way and stays queued in order
         display.ungrab_pointer(X.CurrentTime)
-        display.sync()
 
         # Restore original cursor position (uses warp_pointer on native X11, XTest on Crostini)
         if self._original_position:
-            self.cursorPosition_set(self._original_position)
+            self._cursorPosition_enforce(self._original_position)
             self._original_position = None
 
+        # Single round-trip covering both the ungrab and the warp
+        self._display_sync(display)
         self._cursor_confined = False
 
-    def cursorPosition_set(self, position: Position) -> None:
+    def _cursorPosition_enforce(self, position: Position) -> None:
         """
-        Move cursor to absolute position using dual-method enforcement.
-        
+        Move the cursor for confine/release, falling back to XTest motion.
         
-        
-        1. Native WarpPointer (Software layer)
-        2. XTest Fake Input (Hardware layer)
+        Some compositors ignore WarpPointer even on a native session. The
+        per-sample path detects that in cursorPosition_setAndVerify; these
+        rare transitions cannot afford a lost move, so on native X11 the warp
+        is always followed by XTest motion to the same position. Both are
+        only flushed; the callers' round-trips cover them.
         
         Args:
-            position: position value.
+            position: Target root position.
         
         Returns:
-            Result value.
+            None.
         """
-        try:
-            self.cursorPosition_setViaWarpPointer(position)
-            self.connection_sync()
-        except Exception:
-            pass
-            
-        try:
+        self.cursorPosition_set(position)
+        if self._native_x11 and self._has_xtest:
             self.cursorPosition_setViaXTest(position)
-            self.connection_sync()
-        except Exception:
-            pass
 
     def connection_sync(self) -> None:
         """
@@ -427,6 +733,7 @@ class DisplayManager:
         # 1. Sync Python-xlib connection
         if self._display:
             self._display.sync()
+            self._xlibIdle_mark(self._display)
         
         # 2. Sync Native libX11 connection (for XFixes)
         global _xfixes_display_ptr
@@ -436,9 +743,89 @@ class DisplayManager:
             except Exception:
                 pass
 
+    @contextlib.contextmanager
+    def requests_batch(self) -> Iterator[None]:
+        """
+        Group several display requests behind one final round-trip.
+        
+        Inside the block, methods that would sync only flush; a single sync
+        runs on exit. Grabs still wait for their own replies. Nested blocks
+        join the outermost one.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        if self._in_batch:
+            yield
+            return
+        self._in_batch = True
+        try:
+            yield
+        finally:
+            self._in_batch = False
+            if self._display is not None:
+                self._display.sync()
+                self._xlibIdle_mark(self._display)
+
+    def _display_sync(self, display: Display) -> None:
+        """
+        Sync the display, or only flush while inside requests_batch().
+        
+        Args:
+            display: display value.
+        
+        Returns:
+            Result value.
+        """
+        if self._in_batch:
+            display.flush()
+        else:
+            display.sync()
+            self._xlibIdle_mark(display)
+
+    def _xlibIdle_mark(self, display: Display) -> None:
+        """
+        Record that the server has processed every python-xlib request so far.
+        
+        Call right after a round-trip (sync or a reply) on that connection.
+        
+        Args:
+            display: display value.
+        
+        Returns:
+            None.
+        """
+        self._xlib_idle_serial = display.display.request_serial
+
+    def _xcbOrdered_check(self, display: Display) -> bool:
+        """
+        Check whether a pointer request may go on the xcb channel.
+        
+        The two connections are not ordered against each other, so xcb is
+        used only when python-xlib has sent nothing since its last round-trip
+        (e.g. an ungrab queued just before a warp). Otherwise the request
+        stays on python-xlib, behind what is already queued there.
+        
+        Args:
+            display: display value.
+        
+        Returns:
+            True if the xcb channel can carry the request.
+        """
+        return (
+            self._xcb is not None
+            and display.display.request_serial == self._xlib_idle_serial
+        )
+
     def cursorPosition_setViaWarpPointer(self, position: Position) -> None:
         """
         Move cursor using native X11 warp_pointer (works on native X11 only).
+
+        Best effort: errors are logged rather than raised so a lost
+        connection does not abort a pointer sample.
         
         Args:
             position: position value.
@@ -446,23 +833,49 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        try:
+            display = self.display_get()
 
-        logger.debug(f"[X11] warp_pointer to ({position.x}, {position.y})")
-        root.warp_pointer(position.x, position.y)
-        display.sync()
+            logger.debug("[X11] warp_pointer to (%d, %d)", position.x, position.y)
+            if self._xcbOrdered_check(display):
+                self._xcb.pointer_warp(position.x, position.y)
+                self._xcb.flush()
+                self._xcb.errors_poll()
+                self._pointer_via_xcb = True
+            else:
+                self._warpRequest_queue(position.x, position.y)
+                display.flush()
+                self._pointer_via_xcb = False
+
+            # Verify position (a full round-trip, so only when it will be logged)
+            if logger.isEnabledFor(logging.DEBUG):
+                actual_x, actual_y = self._pointerOrdered_query()
+                logger.debug("[X11] After warp: actual position = (%d, %d)", actual_x, actual_y)
+        except Exception as exc:
+            logger.warning(
+                "[X11] warp_pointer to (%d, %d) failed: %r", position.x, position.y, exc
+            )
 
-        # Verify position
-        pointer_data = root.query_pointer()
-        actual_x = pointer_data.root_x
-        actual_y = pointer_data.root_y
-        logger.debug(f"[X11] After warp: actual position = ({actual_x}, {actual_y})")
+    def _warpRequest_queue(self, x: int, y: int) -> None:
+        """
+        Queue a pre-encoded absolute WarpPointer request without flushing.
+        
+        Args:
+            x: Target root X coordinate.
+            y: Target root Y coordinate.
+        
+        Returns:
+            Result value.
+        """
+        wire.request_queue(
+            self._display.display, self._warp_prefix + wire.WARP_POINTER_DEST.pack(x, y)
+        )
 
     def cursorPosition_setViaXTest(self, position: Position) -> None:
         """
         Move cursor using XTest fake_input (Crostini/Wayland workaround).
+
+        Best effort, like cursorPosition_setViaWarpPointer.
         
         Args:
             position: position value.
@@ -470,19 +883,40 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        display = self.display_get()
-
-        logger.debug(f"[X11] XTest fake_input MotionNotify to ({position.x}, {position.y})")
-        xtest.fake_input(display, X.MotionNotify, detail=0, x=position.x, y=position.y)
-        display.sync()
+        if not self._has_xtest:
+            # Checked once per connection; fake_input would raise on every move
+            return
+        try:
+            display = self.display_get()
 
-        # Verify position
-        screen = display.screen()
-        root = screen.root
-        pointer_data = root.query_pointer()
-        actual_x = pointer_data.root_x
-        actual_y = pointer_data.root_y
-        logger.debug(f"[X11] After XTest move: actual position = ({actual_x}, {actual_y})")
+            logger.debug(
+                "[X11] XTest fake_input MotionNotify to (%d, %d)", position.x, position.y
+            )
+            if self._xcbOrdered_check(display) and self._xcb.has_xtest:
+                self._xcb.pointer_motionFake(position.x, position.y)
+                self._xcb.flush()
+                self._xcb.errors_poll()
+                self._pointer_via_xcb = True
+            else:
+                wire.request_queue(
+                    display.display,
+                    wire.fakeInput_pack(
+                        self._xtest_opcode, X.MotionNotify, 0, position.x, position.y
+                    ),
+                )
+                display.flush()
+                self._pointer_via_xcb = False
+
+            # Verify position (a full round-trip, so only when it will be logged)
+            if logger.isEnabledFor(logging.DEBUG):
+                actual_x, actual_y = self._pointerOrdered_query()
+                logger.debug(
+                    "[X11] After XTest move: actual position = (%d, %d)", actual_x, actual_y
+                )
+        except Exception as exc:
+            logger.warning(
+                "[X11] XTest motion to (%d, %d) failed: %r", position.x, position.y, exc
+            )
 
     def cursorPosition_setAndVerify(
         self, position: Position, timeout_ms: int = 100, tolerance: int = 5
@@ -506,37 +940,72 @@ class DisplayManager:
             RuntimeError: If not connected to display
         """
         display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        root = self._root
 
         # Issue warp command (uses warp_pointer on native X11, XTest on Crostini)
         self.cursorPosition_set(position)
 
-        # Poll position until it matches or timeout
-        start_time = time.time()
-        timeout_sec = timeout_ms / 1000.0
+        # query_pointer is itself a round-trip, so a matching first reply is
+        # authoritative. XTest motion can still be queued behind it; rather than
+        # polling, block on the connection until the server sends anything
+        # (motion from an active grab, or other events) and re-query then.
+        actual_x, actual_y = self._pointerOrdered_query()
+        if abs(actual_x - position.x) <= tolerance and abs(actual_y - position.y) <= tolerance:
+            return True
+
+        # A compositor that ignores WarpPointer will not move the cursor no
+        # matter how long we wait; try XTest motion once instead.
+        if self._native_x11 and self._has_xtest:
+            logger.debug("[X11] Warp not honoured, retrying with XTest motion")
+            self.cursorPosition_setViaXTest(position)
+            actual_x, actual_y = self._pointerOrdered_query()
+            if abs(actual_x - position.x) <= tolerance and abs(actual_y - position.y) <= tolerance:
+                return True
 
-        while (time.time() - start_time) < timeout_sec:
-            # Query actual position
+        fileno: int = display.fileno()
+        deadline_ns: int = time.monotonic_ns() + timeout_ms * 1_000_000
+        while True:
+            remaining_ns: int = deadline_ns - time.monotonic_ns()
+            if remaining_ns <= 0:
+                break
+            readable, _, _ = select.select([fileno], [], [], remaining_ns / 1e9)
+            # query_pointer also reads (and queues) whatever woke us
             pointer_data = root.query_pointer()
             actual_x = pointer_data.root_x
             actual_y = pointer_data.root_y
-
-            # Check if position matches within tolerance
             if abs(actual_x - position.x) <= tolerance and abs(actual_y - position.y) <= tolerance:
                 return True
+            if not readable:
+                break
 
-            # Small delay before next poll (1ms)
-            time.sleep(0.001)
-            display.sync()
-
-        # Timeout - position never matched
         logger.warning(
-            f"Cursor warp verification failed: target=({position.x},{position.y}), "
-            f"actual=({actual_x},{actual_y}), timeout={timeout_ms}ms"
+            "Cursor warp verification failed: target=(%d,%d), actual=(%d,%d), timeout=%dms",
+            position.x,
+            position.y,
+            actual_x,
+            actual_y,
+            timeout_ms,
         )
         return False
 
+    def _pointerOrdered_query(self) -> tuple[int, int]:
+        """
+        Query the pointer on the connection that carried the last warp.
+        
+        Only a reply on that connection is ordered after the warp or motion.
+        
+        Args:
+            None.
+        
+        Returns:
+            Root (x, y) coordinates.
+        """
+        if self._pointer_via_xcb and self._xcb is not None:
+            return self._xcb.pointer_query()
+        pointer_data = self._root.query_pointer()
+        self._xlibIdle_mark(self._display)
+        return pointer_data.root_x, pointer_data.root_y
+
     def _ensure_blank_cursor(self) -> int:
         """
         Create a blank cursor if one doesn't exist
@@ -552,34 +1021,30 @@ class DisplayManager:
             return self._blank_cursor
 
         display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        root = self._root
 
         try:
-            # Create a 1x1 bitmap (depth 1)
+            # All requests below are one-way; they are pipelined and leave in
+            # a single flush. New pixmap contents are undefined, so the 1x1
+            # bitmap (depth 1) must be cleared before it can serve as a mask.
             pixmap = root.create_pixmap(1, 1, 1)
-
-            # Create a GC to draw into the pixmap
             gc = pixmap.create_gc(foreground=0, background=0)
-
-            # clear the pixmap (make it 0)
             pixmap.fill_rectangle(gc, 0, 0, 1, 1)
 
-            # Color must be a dictionary with RGB values for python-xlib
-            color = {"red": 0, "green": 0, "blue": 0}
+            # Source and mask are the same all-zero bitmap, so the mask is
+            # empty -> fully transparent. Colors are (red, green, blue).
+            black = (0, 0, 0)
+            cursor = pixmap.create_cursor(pixmap, black, black, 0, 0)
 
-            # Create cursor. mask=pixmap means the shape is defined by pixmap.
-            # since pixmap is all 0s, the mask is empty -> fully transparent.
-            cursor = display.create_pixmap_cursor(pixmap, pixmap, color, color, 0, 0)
-
-            # Cleanup
-            pixmap.free()
+            # The server keeps what the cursor needs; drop our handles
             gc.free()
+            pixmap.free()
+            display.flush()
 
             self._blank_cursor = cursor
             return cursor
         except Exception as e:
-            logger.error(f"Failed to create blank cursor: {e}")
+            logger.error("Failed to create blank cursor: %s", e)
             return 0
 
     def _remoteCursor_create(self) -> int:
@@ -623,7 +1088,7 @@ class DisplayManager:
             return cursor
 
         except Exception as e:
-            logger.error(f"Failed to create gray X cursor: {e}")
+            logger.error("Failed to create gray X cursor: %s", e)
             return 0
 
     def _cursorOverlay_create(self) -> bool:
@@ -639,9 +1104,9 @@ class DisplayManager:
         if self._cursor_overlay_window is not None:
             return True  # Already exists
 
-        display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        self.display_get()
+        root = self._root
+        screen = self._screen
 
         try:
             # Create the cursor first
@@ -665,9 +1130,12 @@ class DisplayManager:
                 X.CopyFromParent,  # visual
                 background_pixel=0,  # transparent (won't matter)
                 override_redirect=True,  # bypass window manager
+                save_under=True,  # server caches what the overlay covers
                 cursor=cursor,  # the gray X cursor
                 event_mask=0,  # don't capture any events
             )
+            # Stack on top while still unmapped so show is a cheap map
+            self._cursor_overlay_window.configure(stack_mode=X.Above)
 
             # Make window transparent using the
             # We set colormap to make the background not drawn
@@ -677,7 +1145,7 @@ class DisplayManager:
             return True
 
         except Exception as e:
-            logger.error(f"Failed to create cursor overlay: {e}")
+            logger.error("Failed to create cursor overlay: %s", e)
             self._cursor_overlay_window = None
             return False
 
@@ -698,14 +1166,15 @@ class DisplayManager:
 
         try:
             display = self.display_get()
-            self._cursor_overlay_window.map()
-            # Raise to top to ensure cursor is visible
+            # Re-raise before mapping: windows raised since creation would
+            # otherwise cover it. Both requests go out in one flush.
             self._cursor_overlay_window.configure(stack_mode=X.Above)
-            display.sync()
+            self._cursor_overlay_window.map()
+            display.flush()
             logger.info("Cursor overlay shown (gray X cursor active)")
             return True
         except Exception as e:
-            logger.error(f"Failed to show cursor overlay: {e}")
+            logger.error("Failed to show cursor overlay: %s", e)
             return False
 
     def _cursorOverlay_hide(self) -> None:
@@ -724,16 +1193,21 @@ class DisplayManager:
 
         try:
             display = self.display_get()
+            # Unmap is one-way; flush so it does not cost a round-trip
             self._cursor_overlay_window.unmap()
-            display.sync()
+            display.flush()
             logger.debug("Cursor overlay hidden")
         except Exception as e:
-            logger.warning(f"Failed to hide cursor overlay: {e}")
+            logger.warning("Failed to hide cursor overlay: %s", e)
 
     def cursor_hide(self) -> None:
         """
         Hide cursor or change to remote-mode indicator.
         
+        Tries the method that worked last time first; if it fails, walks the
+        per-connection strategy table resolved by _cursorHideMethods_resolve
+        until one method succeeds.
+        
         Args:
             None.
         
@@ -743,60 +1217,80 @@ class DisplayManager:
         if self._cursor_hidden:
             return
 
-        display = self.display_get()
-        root = display.screen().root
-        native_x11: bool = self._x11native or is_native_x11()
+        self.display_get()
+        remembered = self._cursor_hide_method
+        if remembered is not None:
+            if remembered():
+                self._cursor_hidden = True
+                return
+            self._cursor_hide_method = None
 
-        if native_x11 and not self._overlay_enabled:
-            hidden_ok: bool = self._cursorHideNative_try(display, root.id, root)
-        else:
-            hidden_ok = self._cursorHideWaylandLike_try(display, root)
+        for hide_method in self._cursor_hide_methods:
+            if hide_method is not remembered and hide_method():
+                self._cursor_hide_method = hide_method
+                self._cursor_hidden = True
+                return
 
-        if not hidden_ok:
-            logger.warning("All cursor hiding methods failed")
+        logger.warning("All cursor hiding methods failed")
 
-    def _cursorHideNative_try(self, display, root_id: int, root) -> bool:
+    def _cursorHideMethods_resolve(self) -> tuple[Callable[[], bool], ...]:
         """
-        Try native X11 cursor hide sequence.
+        Resolve the ordered cursor-hide strategy table for this connection.
+
+        Session type, overlay setting and XFIXES support are fixed for the life
+        of a connection, so the selection is made once instead of per hide.
 
         Args:
-            display: X11 display object.
-            root_id: Root window XID.
-            root: Root window object.
+            None.
 
         Returns:
-            True when cursor hide succeeded.
+            Hide methods in preference order; each returns True on success.
         """
-        logger.debug("Using native X11 cursor hiding methods")
-        if xfixes_hide_cursor_native(display, root_id):
-            self._cursor_hidden = True
-            logger.info("Cursor hidden (native XFixes via ctypes)")
-            return True
-        return self._cursorOnRoot_set(root, display, use_blank=True) or self._cursorOnRoot_set(
-            root, display, use_blank=False
+        fallback_methods: tuple[Callable[[], bool], ...] = (
+            self._cursorBlankOnRoot_set,
+            self._cursorRemoteOnRoot_set,
         )
+        if self._native_x11 and not self._overlay_enabled:
+            logger.debug("Using native X11 cursor hiding methods")
+            if self._has_xfixes:
+                return (self._cursorXFixes_hide,) + fallback_methods
+            return fallback_methods
 
-    def _cursorHideWaylandLike_try(self, display, root) -> bool:
-        """
-        Try Wayland/Crostini-compatible cursor hide sequence.
+        logger.debug("Using Crostini/Wayland cursor hiding methods")
+        if self._overlay_enabled:
+            return (self._cursorOverlay_show,) + fallback_methods
+        logger.debug("Overlay disabled, using fallback methods")
+        return fallback_methods
 
-        Args:
-            display: X11 display object.
-            root: Root window object.
+    def _cursorXFixes_hide(self) -> bool:
+        """
+        Hide the cursor through native XFixes.
 
         Returns:
             True when cursor hide succeeded.
         """
-        logger.debug("Using Crostini/Wayland cursor hiding methods")
-        if self._overlay_enabled:
-            if self._cursorOverlay_show():
-                self._cursor_hidden = True
-                return True
-        else:
-            logger.debug("Overlay disabled, trying fallback methods")
-        return self._cursorOnRoot_set(root, display, use_blank=True) or self._cursorOnRoot_set(
-            root, display, use_blank=False
-        )
+        if not xfixes_hide_cursor_native(self._display, self._root.id):
+            return False
+        logger.info("Cursor hidden (native XFixes via ctypes)")
+        return True
+
+    def _cursorBlankOnRoot_set(self) -> bool:
+        """
+        Set the root cursor to the blank pixmap cursor.
+
+        Returns:
+            True when cursor attribute update succeeded.
+        """
+        return self._cursorOnRoot_set(self._root, self._display, use_blank=True)
+
+    def _cursorRemoteOnRoot_set(self) -> bool:
+        """
+        Set the root cursor to the gray-X remote indicator cursor.
+
+        Returns:
+            True when cursor attribute update succeeded.
+        """
+        return self._cursorOnRoot_set(self._root, self._display, use_blank=False)
 
     def _cursorOnRoot_set(self, root, display, use_blank: bool) -> bool:
         """
@@ -815,8 +1309,7 @@ class DisplayManager:
             if not cursor:
                 return False
             root.change_attributes(cursor=cursor)
-            display.sync()
-            self._cursor_hidden = True
+            self._display_sync(display)
             if use_blank:
                 logger.info("Cursor hidden (blank pixmap)")
             else:
@@ -824,9 +1317,9 @@ class DisplayManager:
             return True
         except Exception as e:
             if use_blank:
-                logger.debug(f"Failed to set blank cursor: {e}")
+                logger.debug("Failed to set blank cursor: %s", e)
             else:
-                logger.debug(f"Failed to set gray X cursor: {e}")
+                logger.debug("Failed to set gray X cursor: %s", e)
             return False
 
     def cursor_show(self) -> None:
@@ -843,14 +1336,13 @@ class DisplayManager:
             return
 
         display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        root = self._root
 
         # First: Hide overlay window if it exists
         self._cursorOverlay_hide()
 
         # Try native XFixes first if available
-        if xfixes_show_cursor_native(display, root.id):
+        if self._has_xfixes and xfixes_show_cursor_native(display, root.id):
             self._cursor_hidden = False
             logger.debug("Cursor shown (native XFixes via ctypes)")
             return
@@ -858,11 +1350,77 @@ class DisplayManager:
         # Fallback: Restore default cursor on root (cursor=0 means None/default)
         try:
             root.change_attributes(cursor=0)
-            display.sync()
+            self._display_sync(display)
             self._cursor_hidden = False
             logger.debug("Cursor shown (restored to default)")
         except Exception as e:
-            logger.error(f"Failed to show cursor: {e}")
+            logger.error("Failed to show cursor: %s", e)
+
+    def _grabNoise_drain(self, max_ns: int = 200_000) -> None:
+        """
+        Discard focus and crossing events queued at the head by a grab.
+        
+        Stops at the first other event so grabbed input stays queued, in
+        order, for the input capturer. Bounded by a small time budget.
+        
+        Args:
+            max_ns: Time budget in nanoseconds.
+        
+        Returns:
+            Result value.
+        """
+        display = self._display
+        event_queue = display.display.event_queue
+        deadline_ns: int = time.monotonic_ns() + max_ns
+        display.pending_events()  # Pull whatever the grab reply brought along
+        while (
+            event_queue
+            and event_queue[0].type in _GRAB_NOISE_EVENTS
+            and time.monotonic_ns() < deadline_ns
+        ):
+            display.next_event()
+
+    def _pointerGrab_request(self, confine_to: object, cursor: object) -> int:
+        """
+        Issue the root pointer grab shared by pointer_grab and cursor_confine.
+        
+        Args:
+            confine_to: Window to confine the pointer to, or 0 for none.
+            cursor: Cursor to show during the grab, or 0 for the default.
+        
+        Returns:
+            Grab status from the server (0 = GrabSuccess).
+        """
+        grab_cookie = self._pointerGrab_send(confine_to, cursor)
+        grab_cookie.reply()
+        return grab_cookie.status
+
+    def _pointerGrab_send(self, confine_to: object, cursor: object) -> xrequest.GrabPointer:
+        """
+        Send the root pointer grab without waiting for its reply.
+        
+        The request is queued like any other; call reply() on the result to
+        wait, then read status (0 = GrabSuccess).
+        
+        Args:
+            confine_to: Window to confine the pointer to, or 0 for none.
+            cursor: Cursor to show during the grab, or 0 for the default.
+        
+        Returns:
+            Deferred GrabPointer request.
+        """
+        return xrequest.GrabPointer(
+            display=self._display.display,
+            defer=True,
+            owner_events=True,  # we receive events
+            grab_window=self._root,
+            event_mask=_POINTER_EVENT_MASK,
+            pointer_mode=X.GrabModeAsync,
+            keyboard_mode=X.GrabModeAsync,
+            confine_to=confine_to,
+            cursor=cursor,
+            time=X.CurrentTime,
+        )
 
     def pointer_grab(self) -> None:
         """
@@ -874,26 +1432,16 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        self.display_get()
 
         # Use blank cursor if hidden, otherwise 0 (None/default)
         cursor = self._blank_cursor if (self._cursor_hidden and self._blank_cursor) else 0
 
-        result = root.grab_pointer(
-            True,  # owner_events - we receive events
-            X.PointerMotionMask | X.ButtonPressMask | X.ButtonReleaseMask,
-            X.GrabModeAsync,
-            X.GrabModeAsync,
-            0,  # Don't confine to window (0 = no confinement)
-            cursor,  # Use blank cursor if hidden
-            X.CurrentTime,
-        )
+        result = self._pointerGrab_request(0, cursor)  # 0 = no confinement
 
-        if result == 0:  # GrabSuccess
-            display.sync()
+        if result == 0:  # GrabSuccess (the grab reply already round-tripped)
             logger.debug("Pointer grabbed successfully")
+            self._grabNoise_drain()
         else:
             raise RuntimeError(f"Failed to grab pointer: result {result}")
 
@@ -909,7 +1457,7 @@ class DisplayManager:
         """
         display = self.display_get()
         display.ungrab_pointer(X.CurrentTime)
-        display.sync()
+        display.flush()  # One-way request: push it out without waiting for a reply
         logger.debug("Pointer ungrabbed")
 
     def keyboard_grab(self) -> None:
@@ -922,9 +1470,8 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        display = self.display_get()
-        screen = display.screen()
-        root = screen.root
+        self.display_get()
+        root = self._root
 
         result = root.grab_keyboard(
             True,  # owner_events - we receive events
@@ -933,8 +1480,7 @@ class DisplayManager:
             X.CurrentTime,
         )
 
-        if result == 0:  # GrabSuccess
-            display.sync()
+        if result == 0:  # GrabSuccess (the grab reply already round-tripped)
             logger.debug("Keyboard grabbed successfully")
         else:
             raise RuntimeError(f"Failed to grab keyboard: result {result}")
@@ -951,7 +1497,7 @@ class DisplayManager:
         """
         display = self.display_get()
         display.ungrab_keyboard(X.CurrentTime)
-        display.sync()
+        display.flush()  # One-way request: push it out without waiting for a reply
         logger.debug("Keyboard ungrabbed")
 
     def connection_fileno(self) -> int:
@@ -976,7 +1522,12 @@ class DisplayManager:
         Returns:
             Result value.
         """
-        """Process all pending X11 events."""
         display = self.display_get()
-        while display.pending_events() > 0:
-            display.next_event()
+        pending_events = display.pending_events
+        next_event = display.next_event
+        pending_count: int = pending_events()
+        while pending_count > 0:
+            # Drain the whole counted batch, then re-check for late arrivals
+            for _ in range(pending_count):
+                next_event()
+            pending_count = pending_events()
@@ -1,21 +1,71 @@
 """X11 event injection using XTest extension"""
 
+import contextlib
 import logging
-from typing import Any
+import time
+from typing import Any, Iterator
 
 from Xlib import X
 from Xlib.ext import xtest
 
-from tx2tx.common.types import KeyEvent, MouseEvent, Position
+from tx2tx.common.types import EventType, KeyEvent, MouseEvent, Position
+from tx2tx.x11 import wire
 from tx2tx.x11.display import DisplayManager
 
 logger = logging.getLogger(__name__)
 _GLOBAL_SHORTCUT_MODIFIER_MASK: int = 0x4 | 0x8 | 0x40
+# How long a resolved pointer leaf window is trusted while the pointer and
+# the top-level window under it stay the same
+_FOCUS_CACHE_TTL_NS: int = 50_000_000
+# Event type members compared by identity on every injected event
+_MOUSE_MOVE: EventType = EventType.MOUSE_MOVE
+_MOUSE_BUTTON_PRESS: EventType = EventType.MOUSE_BUTTON_PRESS
+_MOUSE_BUTTON_RELEASE: EventType = EventType.MOUSE_BUTTON_RELEASE
+_KEY_PRESS: EventType = EventType.KEY_PRESS
+_KEY_RELEASE: EventType = EventType.KEY_RELEASE
+
+
+def _fakeInputRaw_bind(protocol_display: Any, major_opcode: int) -> Any:
+    """
+    Build a fake_input replacement that queues pre-encoded XTEST requests.
+    
+    The returned callable takes the same leading arguments as
+    ``xtest.fake_input`` so either can be bound as the injector's sender.
+    
+    Args:
+        protocol_display: ``Display.display`` of a python-xlib Display.
+        major_opcode: XTEST major opcode for this connection.
+    
+    Returns:
+        Callable ``(display, event_type, detail=0, x=0, y=0)``.
+    """
+    fake_input_pack = wire.fakeInput_pack
+    request_queue = wire.request_queue
+
+    def fake_input(
+        _display: Any, event_type: int, detail: int = 0, x: int = 0, y: int = 0
+    ) -> None:
+        request_queue(protocol_display, fake_input_pack(major_opcode, event_type, detail, x, y))
+
+    return fake_input
 
 
 class EventInjector:
     """Injects mouse and keyboard events into X11 using XTest extension"""
 
+    __slots__ = (
+        "_display_manager",
+        "_display",
+        "_root",
+        "_fake_input",
+        "_flush",
+        "_focus_cache",
+        "_in_batch",
+        "_pending_move",
+        "_keysym_cache",
+        "_last_motion",
+    )
+
     def __init__(self, display_manager: DisplayManager) -> None:
         """
         Initialize event injector
@@ -27,6 +77,85 @@ class EventInjector:
             Result value.
         """
         self._display_manager: DisplayManager = display_manager
+        # Connection handles, bound on first injection (the manager may not
+        # be connected yet when the injector is built)
+        self._display: Any | None = None
+        self._root: Any | None = None
+        self._fake_input: Any = None
+        self._flush: Any = None
+        # (root_x, root_y, top-level child, resolved at ns) -> focused leaf
+        self._focus_cache: tuple[int, int, Any, int, Any] | None = None
+        self._in_batch: bool = False  # True inside injections_batch()
+        # Latest motion target not yet sent, only set inside a batch
+        self._pending_move: Position | None = None
+        # keysym -> keycode; python-xlib's own table only changes when a
+        # MappingNotify is fed to refresh_keyboard_mapping, which this client
+        # never does, so entries stay valid for the connection
+        self._keysym_cache: dict[int, int] = {}
+        # Last motion target sent or queued; repeats of it are skipped
+        self._last_motion: Position | None = None
+        # Cached handles belong to one connection; drop them when it changes
+        display_manager.connectionListener_add(self._reconnect)
+
+    def _handles_bind(self) -> Any:
+        """
+        Cache the display, root window and hot-path callables.
+        
+        Args:
+            None.
+        
+        Returns:
+            Bound display.
+        """
+        display = self._display_manager.display_get()
+        self._display = display
+        self._root = display.screen().root
+        # Encode FakeInput directly when the opcode is known; python-xlib's
+        # xtest wrapper stays as the fallback
+        self._fake_input = xtest.fake_input
+        try:
+            if display.has_extension("XTEST"):
+                self._fake_input = _fakeInputRaw_bind(
+                    display.display, display.get_extension_major("XTEST")
+                )
+        except Exception as exc:
+            logger.debug("Using python-xlib XTEST encoding: %r", exc)
+        self._flush = display.flush
+        return display
+
+    def _reconnect(self) -> None:
+        """
+        Drop cached handles so the next injection rebinds to a new connection.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        self._display = None
+        self._root = None
+        self._fake_input = None
+        self._flush = None
+        self._focus_cache = None
+        self._pending_move = None
+        self._keysym_cache.clear()
+        self._last_motion = None
+
+    def pointerState_invalidate(self) -> None:
+        """
+        Forget the last injected motion after the pointer left our control.
+        
+        Called when the remote cursor is hidden or the pointer leaves this
+        screen, so the next button event re-sends its move.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        self._last_motion = None
 
     def xtestExtension_verify(self) -> bool:
         """
@@ -46,15 +175,40 @@ class EventInjector:
         """
         Move mouse pointer to absolute position
         
+        Inside injections_batch() the move only replaces the pending motion
+        target; it is sent before the next button or key event, or on exit.
+        The target is remembered only for the rest of the batch, while no
+        other client can have moved the pointer in between.
+        
         Args:
             position: position value.
         
         Returns:
             Result value.
         """
-        display = self._display_manager.display_get()
-        xtest.fake_input(display, X.MotionNotify, detail=0, x=position.x, y=position.y)
-        # Removed sync() for performance - Xlib buffer will be flushed periodically
+        if self._in_batch:
+            self._last_motion = position
+            self._pending_move = position
+            return
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.MotionNotify, detail=0, x=position.x, y=position.y)
+
+    def _pendingMove_flush(self) -> None:
+        """
+        Send the coalesced motion target, if any, ahead of other input.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        position = self._pending_move
+        if position is None:
+            return
+        self._pending_move = None
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.MotionNotify, detail=0, x=position.x, y=position.y)
 
     def mouseButton_press(self, button: int) -> None:
         """
@@ -66,8 +220,10 @@ class EventInjector:
         Returns:
             Result value.
         """
-        display = self._display_manager.display_get()
-        xtest.fake_input(display, X.ButtonPress, detail=button)
+        if self._pending_move is not None:
+            self._pendingMove_flush()
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.ButtonPress, detail=button)
 
     def mouseButton_release(self, button: int) -> None:
         """
@@ -79,8 +235,10 @@ class EventInjector:
         Returns:
             Result value.
         """
-        display = self._display_manager.display_get()
-        xtest.fake_input(display, X.ButtonRelease, detail=button)
+        if self._pending_move is not None:
+            self._pendingMove_flush()
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.ButtonRelease, detail=button)
 
     def mouseEvent_inject(self, event: MouseEvent) -> None:
         """
@@ -92,26 +250,31 @@ class EventInjector:
         Returns:
             Result value.
         """
-        from tx2tx.common.types import EventType
-
-        display = self._display_manager.display_get()
+        if self._display is None:
+            self._handles_bind()
 
-        # Always move if position is provided
-        if event.position:
-            self.mousePointer_move(event.position)
+        # Move if a position is provided, unless it is where the pointer was
+        # last sent (button events usually repeat the drag position)
+        position = event.position
+        if position and position != self._last_motion:
+            self.mousePointer_move(position)
 
-        if event.event_type == EventType.MOUSE_MOVE:
+        if event.event_type is _MOUSE_MOVE:
             if not event.position:
                 raise ValueError("MOUSE_MOVE event requires position field for injection")
-        elif event.event_type == EventType.MOUSE_BUTTON_PRESS and event.button:
+        elif event.event_type is _MOUSE_BUTTON_PRESS and event.button:
             self.mouseButton_press(event.button)
-        elif event.event_type == EventType.MOUSE_BUTTON_RELEASE and event.button:
+        elif event.event_type is _MOUSE_BUTTON_RELEASE and event.button:
             self.mouseButton_release(event.button)
 
+        if self._in_batch:
+            return
+        # Flush, not sync: the fake input is one-way and no reply is needed.
+        # Callers that must observe the result use barrier_sync().
         try:
-            display.sync()
+            self._flush()
         except Exception as exc:
-            logger.warning("X11 sync failed after key injection: %r", exc)
+            logger.warning("X11 flush failed after mouse injection: %r", exc)
 
     def key_press(self, keycode: int) -> None:
         """
@@ -123,8 +286,10 @@ class EventInjector:
         Returns:
             Result value.
         """
-        display = self._display_manager.display_get()
-        xtest.fake_input(display, X.KeyPress, detail=keycode)
+        if self._pending_move is not None:
+            self._pendingMove_flush()
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.KeyPress, detail=keycode)
 
     def key_release(self, keycode: int) -> None:
         """
@@ -136,8 +301,10 @@ class EventInjector:
         Returns:
             Result value.
         """
-        display = self._display_manager.display_get()
-        xtest.fake_input(display, X.KeyRelease, detail=keycode)
+        if self._pending_move is not None:
+            self._pendingMove_flush()
+        display = self._display or self._handles_bind()
+        self._fake_input(display, X.KeyRelease, detail=keycode)
 
     def keyEvent_inject(self, event: KeyEvent) -> None:
         """
@@ -149,25 +316,82 @@ class EventInjector:
         Returns:
             Result value.
         """
-        from tx2tx.common.types import EventType
-
-        display = self._display_manager.display_get()
+        display = self._display or self._handles_bind()
 
         keycode = event.keycode
-        if event.keysym is not None:
-            mapped = display.keysym_to_keycode(event.keysym)
+        keysym = event.keysym
+        if keysym is not None:
+            mapped = self._keysym_cache.get(keysym)
+            if mapped is None:
+                mapped = display.keysym_to_keycode(keysym)
+                self._keysym_cache[keysym] = mapped
             if mapped:
                 keycode = mapped
 
+        # Focus follows the pointer, so it must be where the last move put it
+        if self._pending_move is not None:
+            self._pendingMove_flush()
         if self.forceFocusForKeyEvent_check(event):
             self.pointerWindow_focus()
 
-        if event.event_type == EventType.KEY_PRESS:
+        if event.event_type is _KEY_PRESS:
             self.key_press(keycode)
-        elif event.event_type == EventType.KEY_RELEASE:
+        elif event.event_type is _KEY_RELEASE:
             self.key_release(keycode)
 
-        display.sync()
+        if self._in_batch:
+            return
+        # Focus change and key event are ordered on this connection; no
+        # round-trip is needed to deliver them
+        self._flush()
+
+    @contextlib.contextmanager
+    def injections_batch(self) -> Iterator[None]:
+        """
+        Coalesce pointer motion and flush once for a group of events.
+        
+        Inside the block only the latest move is kept until a button or key
+        event needs the pointer in place; the final target and one flush are
+        sent on exit. Nested blocks join the outermost one.
+        
+        Args:
+            None.
+        
+        Returns:
+            Context manager yielding None.
+        """
+        if self._in_batch:
+            yield
+            return
+        self._in_batch = True
+        self._last_motion = None
+        try:
+            yield
+        finally:
+            self._in_batch = False
+            self._last_motion = None
+            try:
+                self._pendingMove_flush()
+                if self._flush is not None:
+                    self._flush()
+            except Exception as exc:
+                logger.warning("X11 flush failed after injection batch: %r", exc)
+
+    def barrier_sync(self) -> None:
+        """
+        Wait until the X server has processed every injected event.
+        
+        Injection only flushes. Use this before reading state that depends on
+        the injected input, such as a pointer query.
+        
+        Args:
+            None.
+        
+        Returns:
+            Result value.
+        """
+        self._pendingMove_flush()
+        (self._display or self._handles_bind()).sync()
 
     def forceFocusForKeyEvent_check(self, event: KeyEvent) -> bool:
         """
@@ -196,17 +420,41 @@ class EventInjector:
         Returns:
             None.
         """
-        display = self._display_manager.display_get()
-        root = display.screen().root
+        if self._root is None:
+            self._handles_bind()
+        root = self._root
         try:
-            focus_window = self.pointerLeafWindow_resolve(root)
+            # One root query identifies the pointer position and top-level
+            # window; if neither changed recently, the leaf we focused last
+            # time still has focus and the deeper walk is skipped.
+            root_reply: Any = root.query_pointer()
+            root_x: int = getattr(root_reply, "root_x", 0)
+            root_y: int = getattr(root_reply, "root_y", 0)
+            top_window: Any | None = getattr(root_reply, "child", None)
+            now_ns: int = time.monotonic_ns()
+            cache = self._focus_cache
+            if (
+                cache is not None
+                and cache[0] == root_x
+                and cache[1] == root_y
+                and cache[2] == top_window
+                and now_ns - cache[3] < _FOCUS_CACHE_TTL_NS
+            ):
+                return
+
+            focus_window = self.pointerLeafWindow_resolve(root, root_reply)
             if focus_window is None:
+                self._focus_cache = None
                 return
             focus_window.set_input_focus(X.RevertToParent, X.CurrentTime)
+            self._focus_cache = (root_x, root_y, top_window, now_ns, focus_window)
         except Exception as exc:
+            self._focus_cache = None
             logger.debug("Could not focus pointer window before key injection: %r", exc)
 
-    def pointerLeafWindow_resolve(self, root_window: Any) -> Any | None:
+    def pointerLeafWindow_resolve(
+        self, root_window: Any, root_reply: Any | None = None
+    ) -> Any | None:
         """
         Resolve the deepest pointer child window from root.
 
@@ -216,6 +464,7 @@ class EventInjector:
 
         Args:
             root_window: X11 root window object.
+            root_reply: Pointer reply already queried on root_window, if any.
 
         Returns:
             Deepest window under pointer, or None when unresolved.
@@ -223,11 +472,14 @@ class EventInjector:
         current_window: Any = root_window
         deepest_window: Any | None = None
         max_depth: int = 16
+        pointer_reply: Any | None = root_reply
         for _ in range(max_depth):
-            pointer_reply: Any = current_window.query_pointer()
+            if pointer_reply is None:
+                pointer_reply = current_window.query_pointer()
             child_window: Any | None = getattr(pointer_reply, "child", None)
             if child_window is None or child_window == 0:
                 break
             deepest_window = child_window
             current_window = child_window
+            pointer_reply = None
         return deepest_window
@@ -5,17 +5,122 @@ This is a more efficient alternative to polling via XQueryPointer and grabbing
 the keyboard, as it uses the X11 RECORD extension to receive all input events
 from the server.
 """
-import queue
-from typing import Optional
+import logging
+import struct
+import threading
+from collections import deque
+from typing import Callable, Optional
 
 from Xlib import X
 from Xlib.display import Display
 from Xlib.ext import record
-from Xlib.protocol import rq
 
+from tx2tx.common.settings import settings
 from tx2tx.common.types import EventType, KeyEvent, MouseEvent, Position
 from tx2tx.x11.display import DisplayManager
 
+logger = logging.getLogger(__name__)
+
+_MOUSE_MOVE: EventType = EventType.MOUSE_MOVE
+
+# Core input event: type, detail, sequence, time, root, event, child,
+# root_x, root_y, ... (32 bytes, client byte order)
+_EVENT_SIZE: int = 32
+_INPUT_EVENT = struct.Struct("=BB18xhh")
+_EVENT_TYPE_MASK: int = 0x7F  # strips the SendEvent flag
+
+
+class _CoalescingEventQueue:
+    """FIFO of captured events that keeps only the latest of consecutive moves.
+
+    The queue holds at most max_events; on overflow motion is dropped before
+    anything else.
+    """
+
+    __slots__ = ("_events", "_max_events", "_ready")
+
+    def __init__(self, max_events: int) -> None:
+        """
+        Initialize an empty queue.
+        
+        Args:
+            max_events: Capacity before events are dropped.
+        
+        Returns:
+            None.
+        """
+        self._events: deque[MouseEvent | KeyEvent] = deque()
+        self._max_events: int = max_events
+        self._ready: threading.Condition = threading.Condition()
+
+    def put(self, event: MouseEvent | KeyEvent) -> None:
+        """
+        Append an event, replacing an unread move at the tail with a new move.
+        
+        Args:
+            event: event value.
+        
+        Returns:
+            None.
+        """
+        with self._ready:
+            events = self._events
+            if (
+                events
+                and event.event_type is _MOUSE_MOVE
+                and events[-1].event_type is _MOUSE_MOVE
+            ):
+                events[-1] = event
+                return
+            if len(events) >= self._max_events and not self._overflow_resolve(event):
+                return
+            events.append(event)
+            self._ready.notify()
+
+    def get(
+        self, block: bool = True, timeout: Optional[float] = None
+    ) -> MouseEvent | KeyEvent | None:
+        """
+        Remove and return the oldest event.
+        
+        Args:
+            block: Wait for an event when the queue is empty.
+            timeout: Longest wait in seconds; None waits indefinitely.
+        
+        Returns:
+            Oldest event, or None when none arrived in time.
+        """
+        with self._ready:
+            if not self._events:
+                if not block or not self._ready.wait_for(lambda: self._events, timeout):
+                    return None
+            return self._events.popleft()
+
+    def _overflow_resolve(self, event: MouseEvent | KeyEvent) -> bool:
+        """
+        Make room for an event in a full queue (lock held).
+        
+        The oldest queued move is discarded first. Without one, a new move is
+        dropped, and any other event evicts the oldest queued event.
+        
+        Args:
+            event: Event about to be appended.
+        
+        Returns:
+            True when the event should still be appended.
+        """
+        events = self._events
+        for index, queued in enumerate(events):
+            if queued.event_type is _MOUSE_MOVE:
+                del events[index]
+                break
+        else:
+            if event.event_type is _MOUSE_MOVE:
+                return False
+            events.popleft()
+        logger.debug("XRecord event queue full; dropped one event")
+        return True
+
 
 class XRecordCapturer:
     """Captures all keyboard and mouse events using the XRecord extension."""
@@ -33,7 +138,10 @@ class XRecordCapturer:
         self._display_manager: DisplayManager = display_manager
         self._display: Display = self._display_manager.display_get()
         self._record_context = None
-        self._event_queue: queue.Queue[MouseEvent | KeyEvent] = queue.Queue()
+        # Motion arrives at device rate; unread moves collapse to the latest
+        self._event_queue: _CoalescingEventQueue = _CoalescingEventQueue(
+            settings.RECORD_EVENT_QUEUE_MAX
+        )
 
         if not self._display.has_extension("RECORD"):
             raise Exception("X RECORD extension not supported on this server.")
@@ -114,34 +222,36 @@ class XRecordCapturer:
         Returns:
             Result value.
         """
-        try:
-            return self._event_queue.get(block=block, timeout=timeout)
-        except queue.Empty:
-            return None
+        return self._event_queue.get(block=block, timeout=timeout)
 
     def _recordEvents_process(self, reply) -> None:
         """
         Callback function to process raw data from the RECORD extension.
         
+        python-xlib keeps the single EnableContext request pending and calls
+        this for every reply until the context is disabled, so it must not
+        enable the context again.
+        
         Args:
             reply: reply value.
         
         Returns:
             Result value.
         """
-        if not reply.client_swapped:
+        # Only FromServer replies carry device events; StartOfData and
+        # EndOfData bracket the context's lifetime
+        if reply.category == record.FromServer and not reply.client_swapped:
+            # Device events are fixed 32-byte core events; decode only the
+            # fields we use instead of running python-xlib's generic parser
             data = reply.data
-            while len(data):
-                event, data = rq.EventField(None).parse_binary_value(
-                    data, self._display.display, None, None
-                )
-                
-                parsed_event = self._xEvent_parse(event)
-                if parsed_event:
-                    self._event_queue.put(parsed_event)
-
-        if self._record_context:
-            self._record_ext.enable_context(self._record_context, self._recordEvents_process)
+            unpack_from = _INPUT_EVENT.unpack_from
+            builders = _EVENT_BUILDERS
+            put = self._event_queue.put
+            for offset in range(0, len(data) - _EVENT_SIZE + 1, _EVENT_SIZE):
+                event_type, detail, root_x, root_y = unpack_from(data, offset)
+                builder = builders.get(event_type & _EVENT_TYPE_MASK)
+                if builder is not None:
+                    put(builder(detail, root_x, root_y))
 
     def _xEvent_parse(self, xev) -> MouseEvent | KeyEvent | None:
         """
@@ -153,29 +263,103 @@ class XRecordCapturer:
         Returns:
             Result value.
         """
-        if xev.type == X.ButtonPress:
-            position = Position(x=xev.root_x, y=xev.root_y)
-            return MouseEvent(
-                event_type=EventType.MOUSE_BUTTON_PRESS,
-                position=position,
-                button=xev.detail,
-            )
-        elif xev.type == X.ButtonRelease:
-            position = Position(x=xev.root_x, y=xev.root_y)
-            return MouseEvent(
-                event_type=EventType.MOUSE_BUTTON_RELEASE,
-                position=position,
-                button=xev.detail,
-            )
-        elif xev.type == X.MotionNotify:
-            position = Position(x=xev.root_x, y=xev.root_y)
-            return MouseEvent(
-                event_type=EventType.MOUSE_MOVE,
-                position=position,
-            )
-        elif xev.type == X.KeyPress:
-            return KeyEvent(event_type=EventType.KEY_PRESS, keycode=xev.detail)
-        elif xev.type == X.KeyRelease:
-            return KeyEvent(event_type=EventType.KEY_RELEASE, keycode=xev.detail)
-        
-        return None
+        builder = _EVENT_BUILDERS.get(xev.type)
+        if builder is None:
+            return None
+        return builder(xev.detail, xev.root_x, xev.root_y)
+
+
+def _buttonPressEvent_build(detail: int, root_x: int, root_y: int) -> MouseEvent:
+    """
+    Build a button-press MouseEvent from recorded event fields.
+    
+    Args:
+        detail: Button or keycode.
+        root_x: Root X coordinate.
+        root_y: Root Y coordinate.
+    
+    Returns:
+        Result value.
+    """
+    return MouseEvent(
+        event_type=EventType.MOUSE_BUTTON_PRESS,
+        position=Position(x=root_x, y=root_y),
+        button=detail,
+    )
+
+
+def _buttonReleaseEvent_build(detail: int, root_x: int, root_y: int) -> MouseEvent:
+    """
+    Build a button-release MouseEvent from recorded event fields.
+    
+    Args:
+        detail: Button or keycode.
+        root_x: Root X coordinate.
+        root_y: Root Y coordinate.
+    
+    Returns:
+        Result value.
+    """
+    return MouseEvent(
+        event_type=EventType.MOUSE_BUTTON_RELEASE,
+        position=Position(x=root_x, y=root_y),
+        button=detail,
+    )
+
+
+def _motionEvent_build(detail: int, root_x: int, root_y: int) -> MouseEvent:
+    """
+    Build a move MouseEvent from recorded event fields.
+    
+    Args:
+        detail: Button or keycode.
+        root_x: Root X coordinate.
+        root_y: Root Y coordinate.
+    
+    Returns:
+        Result value.
+    """
+    return MouseEvent(
+        event_type=EventType.MOUSE_MOVE,
+        position=Position(x=root_x, y=root_y),
+    )
+
+
+def _keyPressEvent_build(detail: int, root_x: int, root_y: int) -> KeyEvent:
+    """
+    Build a key-press KeyEvent from recorded event fields.
+    
+    Args:
+        detail: Button or keycode.
+        root_x: Root X coordinate.
+        root_y: Root Y coordinate.
+    
+    Returns:
+        Result value.
+    """
+    return KeyEvent(event_type=EventType.KEY_PRESS, keycode=detail)
+
+
+def _keyReleaseEvent_build(detail: int, root_x: int, root_y: int) -> KeyEvent:
+    """
+    Build a key-release KeyEvent from recorded event fields.
+    
+    Args:
+        detail: Button or keycode.
+        root_x: Root X coordinate.
+        root_y: Root Y coordinate.
+    
+    Returns:
+        Result value.
+    """
+    return KeyEvent(event_type=EventType.KEY_RELEASE, keycode=detail)
+
+
+# X event type -> builder, looked up once per recorded event
+_EVENT_BUILDERS: dict[int, Callable[[int, int, int], MouseEvent | KeyEvent]] = {
+    X.ButtonPress: _buttonPressEvent_build,
+    X.ButtonRelease: _buttonReleaseEvent_build,
+    X.MotionNotify: _motionEvent_build,
+    X.KeyPress: _keyPressEvent_build,
+    X.KeyRelease: _keyReleaseEvent_build,
+}
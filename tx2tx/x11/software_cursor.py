@@ -1,11 +1,91 @@
 """Software cursor implementation using X11 Overlay Window"""
 
 import logging
+import time
+import weakref
 from Xlib import X
 from Xlib.ext import shape
 
+from tx2tx.common.settings import settings
+from tx2tx.x11 import wire
+
 logger = logging.getLogger(__name__)
 
+# Arrow mask pixmaps per Display, by (width, height). The polygon never
+# changes, so each connection renders it once and every cursor reuses it;
+# cached pixmaps are deliberately never freed. Keyed on the connection object
+# rather than its fd, which a later connection may reuse.
+_SHAPE_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# 16-bit RGB per supported cursor color; anything else is drawn white
+_COLOR_RGB = {
+    "red": (65535, 0, 0),
+    "green": (0, 65535, 0),
+    "blue": (0, 0, 65535),
+}
+_COLOR_RGB_DEFAULT = (65535, 65535, 65535)
+
+# Allocated pixel values per Display, by color, so re-creating a cursor
+# skips the alloc_color round-trip
+_PIXEL_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _displayCaches_purge(display) -> None:
+    """
+    Drop cached pixmaps and pixels of a closed connection
+    
+    Args:
+        display: Display whose entries are removed.
+    
+    Returns:
+        None.
+    """
+    _SHAPE_CACHE.pop(display, None)
+    _PIXEL_CACHE.pop(display, None)
+
+
+def _trueColorPixel_get(screen, rgb: tuple[int, int, int]) -> int | None:
+    """
+    Compute a pixel value locally when the root visual is TrueColor
+    
+    Args:
+        screen: Screen whose root visual is used.
+        rgb: 16-bit red, green and blue components.
+    
+    Returns:
+        Pixel value, or None when the visual needs a colormap allocation.
+    """
+    for depth in screen.allowed_depths:
+        for visual in depth.visuals:
+            if visual.visual_id != screen.root_visual:
+                continue
+            if visual.visual_class != X.TrueColor:
+                return None
+            pixel = 0
+            for component, mask in zip(
+                rgb, (visual.red_mask, visual.green_mask, visual.blue_mask)
+            ):
+                if not mask:
+                    return None
+                shift = (mask & -mask).bit_length() - 1
+                bits = (mask >> shift).bit_length()
+                pixel |= (component >> (16 - bits)) << shift
+            return pixel
+    return None
+
+
+# Simple pointer polygon points, (0,0) is the tip
+_ARROW_POINTS = [
+    (0, 0),    # Tip
+    (0, 18),   # Left edge bottom
+    (5, 13),   # Notch
+    (9, 20),   # Stem bottom left
+    (12, 19),  # Stem bottom right
+    (8, 12),   # Stem top right join
+    (14, 12),  # Right wing
+    (0, 0)     # Close
+]
+
 class SoftwareCursor:
     """
     Renders a software cursor using an override-redirect X11 window.
@@ -25,10 +105,31 @@ class SoftwareCursor:
         """
         self._display_manager = display_manager
         self._window = None
+        # Display, protocol display and encoded ConfigureWindow prefixes
+        # bound in _setup for flush()
+        self._display = None
+        self._protocol_display = None
+        self._move_prefix: bytes = b""
+        self._raise_prefix: bytes = b""
+        # Optional libxcb channel; moves use it once the window exists
+        # server-side, i.e. after the first flush() synced its creation
+        self._xcb = None
+        self._xcb_ready: bool = False
         self._width = 20
         self._height = 20
         self._color = color
-        self._visible = False
+        self._visible = False  # Wanted visibility, applied by flush()
+        self._mapped = False  # Map state last sent to the server
+        # Last window origin requested and when the window was last raised
+        self._last_x: int | None = None
+        self._last_y: int | None = None
+        self._raised_ns: int = 0
+        # Window origin awaiting flush(); moves within a loop tick replace it
+        self._pending: tuple[int, int] | None = None
+        # Map/unmap/setup requests queued since the last flush()
+        self._unflushed: bool = False
+        # The window and cached handles die with the connection
+        display_manager.connectionListener_add(self._connection_changed)
 
     def _setup(self) -> None:
         """
@@ -49,15 +150,16 @@ class SoftwareCursor:
         root = screen.root
 
         # Allocate color
-        cmap = screen.default_colormap
-        if self._color == "red":
-            bg_color = cmap.alloc_color(65535, 0, 0)
-        elif self._color == "green":
-            bg_color = cmap.alloc_color(0, 65535, 0)
-        elif self._color == "blue":
-            bg_color = cmap.alloc_color(0, 0, 65535)
-        else:
-            bg_color = cmap.alloc_color(65535, 65535, 65535)
+        pixels = _PIXEL_CACHE.setdefault(display, {})
+        bg_pixel = pixels.get(self._color)
+        if bg_pixel is None:
+            rgb = _COLOR_RGB.get(self._color, _COLOR_RGB_DEFAULT)
+            # TrueColor pixels follow from the channel masks; only other
+            # visuals pay the alloc_color round-trip
+            bg_pixel = _trueColorPixel_get(screen, rgb)
+            if bg_pixel is None:
+                bg_pixel = screen.default_colormap.alloc_color(*rgb).pixel
+            pixels[self._color] = bg_pixel
 
         # Create window
         # override_redirect=True is CRITICAL: it tells the Window Manager (and Sommelier)
@@ -67,40 +169,24 @@ class SoftwareCursor:
             screen.root_depth,
             X.InputOutput,
             X.CopyFromParent,
-            background_pixel=bg_color.pixel,
+            background_pixel=bg_pixel,
+            # Static bit gravity keeps contents in place on geometry changes
+            # instead of clearing them; background_pixel fills any exposure
+            bit_gravity=X.StaticGravity,
             override_redirect=True
         )
 
         # Apply Shape Mask to make it look like an arrow
         if display.has_extension("SHAPE"):
             try:
-                # Create a bitmap (depth 1) for the mask
-                pm = self._window.create_pixmap(self._width, self._height, 1)
-                gc = pm.create_gc(foreground=0, background=0)
-                
-                # 1. Clear everything to transparent (0)
-                pm.fill_rectangle(gc, 0, 0, self._width, self._height)
-                
-                # 2. Draw the arrow shape as opaque (1)
-                gc.change(foreground=1)
-                
-                # Simple pointer polygon points
-                # (0,0) is the tip
-                points = [
-                    (0, 0),    # Tip
-                    (0, 18),   # Left edge bottom
-                    (5, 13),   # Notch
-                    (9, 20),   # Stem bottom left
-                    (12, 19),  # Stem bottom right
-                    (8, 12),   # Stem top right join
-                    (14, 12),  # Right wing
-                    (0, 0)     # Close
-                ]
-                
-                # X.Complex might be needed if the polygon self-intersects, but this one is convex-ish
-                pm.fill_poly(gc, X.Complex, X.CoordModeOrigin, points)
-                
-                # 3. Apply the mask to the window
+                shapes = _SHAPE_CACHE.setdefault(display, {})
+                key = (self._width, self._height)
+                pm = shapes.get(key)
+                if pm is None:
+                    pm = self._shapePixmap_render()
+                    shapes[key] = pm
+
+                # Apply the mask to the window
                 # Get constants safely (handling different python-xlib versions)
                 SK_Bounding = getattr(shape, "SK_Bounding", 0)
                 if not hasattr(shape, "SK_Bounding"):
@@ -111,26 +197,74 @@ class SoftwareCursor:
                     SO_Set = getattr(shape, "ShapeSet", 0)
                 
                 self._window.shape_mask(SO_Set, SK_Bounding, 0, 0, pm)
-                
-                # Optional: Input shape (XShape 1.1) to allow clicks through transparent parts
-                # If we want the cursor to capture clicks, we leave it. 
-                # If we want clicks to pass through the empty space, we can apply the same mask to Input.
-                # But since we are likely handling input via global grabs or XTest injection, 
-                # visual shape is the priority here.
-                
-                pm.free()
+
                 logger.debug("Applied software cursor shape mask")
                 
             except Exception as e:
-                logger.warning(f"Failed to apply cursor shape: {e}")
+                logger.warning("Failed to apply cursor shape: %s", e)
+
+            # Empty input shape (XShape 1.1): pointer events pass through the
+            # cursor to the window beneath and the server never hit-tests it
+            try:
+                SK_Input = getattr(getattr(shape, "SK", None), "Input", 2)
+                SO_Set = getattr(getattr(shape, "SO", None), "Set", 0)
+                self._window.shape_rectangles(SO_Set, SK_Input, X.Unsorted, 0, 0, [])
+                logger.debug("Made software cursor click-through")
+            except Exception as e:
+                logger.warning("Failed to clear cursor input shape: %s", e)
         else:
             logger.info("SHAPE extension not available; falling back to square cursor")
 
         self._window.map()
-        display.sync()
+        # No sync() round-trip: requests on one connection are processed in
+        # order, so creation and map go out with the first move in flush()
+        self._unflushed = True
         self._visible = True
+        self._mapped = True
+        self._handles_bind(display)
         logger.info("Software cursor created")
 
+    def _handles_bind(self, display) -> None:
+        """
+        Cache the handles flush() sends window moves through
+        
+        Args:
+            display: Display owning the cursor window.
+        
+        Returns:
+            None.
+        """
+        self._display = display
+        self._protocol_display = display.display
+        self._move_prefix = wire.configureWindowPrefix_pack(self._window.id)
+        self._raise_prefix = wire.configureWindowPrefix_pack(self._window.id, stack_mode=True)
+        self._xcb = self._display_manager.xcbChannel_get()
+        self._xcb_ready = False
+
+    def _shapePixmap_render(self):
+        """
+        Render the arrow mask into a new depth-1 pixmap
+        
+        Args:
+            None.
+        
+        Returns:
+            Pixmap holding the cursor shape mask.
+        """
+        # Create a bitmap (depth 1) for the mask
+        pm = self._window.create_pixmap(self._width, self._height, 1)
+        gc = pm.create_gc(foreground=0, background=0)
+
+        # 1. Clear everything to transparent (0)
+        pm.fill_rectangle(gc, 0, 0, self._width, self._height)
+
+        # 2. Draw the arrow shape as opaque (1)
+        gc.change(foreground=1)
+        # X.Complex might be needed if the polygon self-intersects, but this one is convex-ish
+        pm.fill_poly(gc, X.Complex, X.CoordModeOrigin, _ARROW_POINTS)
+        gc.free()
+        return pm
+
     def move(self, x: int, y: int) -> None:
         """
         Move cursor to position
@@ -150,14 +284,79 @@ class SoftwareCursor:
         win_x = x + 5
         win_y = y + 5
 
-        # Use configure to move
-        # stack_mode=X.Above ensures it stays on top of other windows
-        self._window.configure(
-            x=win_x, 
-            y=win_y, 
-            stack_mode=X.Above
-        )
-        # No sync() here for performance, rely on periodic event loop sync
+        if win_x == self._last_x and win_y == self._last_y:
+            return
+        self._last_x = win_x
+        self._last_y = win_y
+        # Sent by flush(), once per event loop tick
+        self._pending = (win_x, win_y)
+
+    def flush(self) -> None:
+        """
+        Send the pending visibility change and cursor move, if any
+        
+        Args:
+            None.
+        
+        Returns:
+            Result value.
+        """
+        if not self._window:
+            return
+        # show()/hide() toggles within a tick collapse to the final state
+        if self._visible != self._mapped:
+            if self._visible:
+                self._window.map()
+                # A freshly mapped window may land below others; raise it
+                self._raised_ns = 0
+            else:
+                self._window.unmap()
+            self._mapped = self._visible
+            self._unflushed = True
+        if self._pending is None:
+            if self._unflushed:
+                self._unflushed = False
+                self._display.flush()
+            return
+        win_x, win_y = self._pending
+        self._pending = None
+
+        # Restacking is server-side work; only re-raise the window above
+        # others on the first move and then periodically
+        now_ns = time.monotonic_ns()
+        raise_interval_ns = int(settings.SOFTWARE_CURSOR_RAISE_INTERVAL_SEC * 1_000_000_000)
+        raise_window = not self._raised_ns or now_ns - self._raised_ns >= raise_interval_ns
+        if raise_window:
+            self._raised_ns = now_ns
+
+        if self._xcb_ready:
+            # Encoded in C on the companion connection; python-xlib is only
+            # flushed when map/unmap requests are waiting
+            self._xcb.window_move(self._window.id, win_x, win_y, stack_above=raise_window)
+            self._xcb.flush()
+            self._xcb.errors_poll()
+            if not self._unflushed:
+                return
+        else:
+            # Only the coordinates are encoded per move; the request is queued
+            # unchecked and goes out with the flush
+            if raise_window:
+                binary = self._raise_prefix + wire.CONFIGURE_WINDOW_POSITION_RAISE.pack(
+                    win_x, win_y, X.Above
+                )
+            else:
+                binary = self._move_prefix + wire.CONFIGURE_WINDOW_POSITION.pack(win_x, win_y)
+            wire.request_queue(self._protocol_display, binary)
+            if self._xcb is not None:
+                # The two connections are not ordered against each other: wait
+                # once until the server has created the window, so moves sent
+                # on the companion connection cannot reach it first
+                self._unflushed = False
+                self._display.sync()
+                self._xcb_ready = True
+                return
+        self._unflushed = False
+        self._display.flush()
 
     def show(self) -> None:
         """
@@ -170,9 +369,7 @@ class SoftwareCursor:
             Result value.
         """
         """Show the cursor"""
-        if self._window and not self._visible:
-            self._window.map()
-            self._visible = True
+        self._visible = True
 
     def hide(self) -> None:
         """
@@ -185,9 +382,7 @@ class SoftwareCursor:
             Result value.
         """
         """Hide the cursor"""
-        if self._window and self._visible:
-            self._window.unmap()
-            self._visible = False
+        self._visible = False
 
     def destroy(self) -> None:
         """
@@ -202,4 +397,60 @@ class SoftwareCursor:
         """Destroy the cursor window"""
         if self._window:
             self._window.destroy()
-            self._window = None
+            self._window_forget()
+
+    def _window_forget(self) -> None:
+        """
+        Drop the window and the handles bound to its connection
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        self._window = None
+        self._display = None
+        self._protocol_display = None
+        self._move_prefix = b""
+        self._raise_prefix = b""
+        self._xcb = None
+        self._xcb_ready = False
+        self._last_x = None
+        self._last_y = None
+        self._raised_ns = 0
+        self._pending = None
+        self._unflushed = False
+        self._mapped = False
+
+    def _connection_changed(self) -> None:
+        """
+        Forget state tied to a connection the display manager has left
+        
+        The next show() or move() then builds a new window on the live
+        connection, and the closed one's cached pixmaps and pixels go away.
+        The pool may hand back the same Display with a new libxcb channel;
+        the window survives then, but the closed channel is dropped.
+        
+        Args:
+            None.
+        
+        Returns:
+            None.
+        """
+        display = self._display
+        if display is None:
+            return
+        try:
+            live = self._display_manager.display_get()
+        except RuntimeError:
+            live = None
+        if live is display:
+            xcb = self._display_manager.xcbChannel_get()
+            if xcb is not self._xcb:
+                # flush() syncs python-xlib once before using the new channel
+                self._xcb = xcb
+                self._xcb_ready = False
+            return
+        _displayCaches_purge(display)
+        self._window_forget()
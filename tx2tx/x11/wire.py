@@ -0,0 +1,127 @@
+"""Pre-encoded X11 requests for high-rate pointer paths.
+
+python-xlib builds every request through its generic field marshaller,
+which dominates the cost of a warp, a fake motion event or a window move. For these
+requests only a few fields change per call, so the encoding is done with
+precompiled ``struct`` layouts instead.
+
+Encoded requests are still queued through python-xlib's ``send_request``
+rather than written to the socket directly. That keeps python-xlib's
+request sequence counter in step with the server, so later replies and
+errors are matched to the right request, and ``flush`` still sends the
+whole queue in one write. Byte order is native, as python-xlib announces
+in its connection setup.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+CONFIGURE_WINDOW_OPCODE: int = 12
+WARP_POINTER_OPCODE: int = 41
+XTEST_FAKE_INPUT_MINOR: int = 2
+
+# opcode, pad, length=6, src_window, dst_window, src_x, src_y, src_width, src_height
+_WARP_POINTER_PREFIX = struct.Struct("=BxHIIhhHH")
+WARP_POINTER_DEST = struct.Struct("=hh")
+
+# opcode, pad, length, window, value_mask, pad; each value follows in a
+# 4-byte slot, INT16 coordinates zero-padded as python-xlib encodes them
+_CONFIGURE_WINDOW_PREFIX = struct.Struct("=BxHIHxx")
+CONFIGURE_WINDOW_POSITION = struct.Struct("=hxxhxx")
+CONFIGURE_WINDOW_POSITION_RAISE = struct.Struct("=hxxhxxI")
+_CW_X: int = 0x01
+_CW_Y: int = 0x02
+_CW_STACK_MODE: int = 0x40
+
+# major, minor, length=9, type, detail, pad, time, root, pad, x, y, pad
+_FAKE_INPUT = struct.Struct("=BBHBBxxII8xhh8x")
+
+
+class RawRequest:
+    """Pre-encoded request for python-xlib's request queue."""
+
+    __slots__ = ("_binary", "_serial")
+
+    def __init__(self, binary: bytes) -> None:
+        """
+        Wrap encoded request bytes.
+
+        Args:
+            binary: Complete request encoding.
+        """
+        self._binary: bytes = binary
+        self._serial: int = 0
+
+
+def warpPointerPrefix_pack(dst_window: int) -> bytes:
+    """
+    Encode an absolute WarpPointer request up to its destination coordinates.
+
+    Append ``WARP_POINTER_DEST.pack(x, y)`` to complete the request.
+
+    Args:
+        dst_window: Window the coordinates are relative to (usually root).
+
+    Returns:
+        20-byte request prefix.
+    """
+    return _WARP_POINTER_PREFIX.pack(WARP_POINTER_OPCODE, 6, 0, dst_window, 0, 0, 0, 0)
+
+
+def configureWindowPrefix_pack(window: int, stack_mode: bool = False) -> bytes:
+    """
+    Encode a ConfigureWindow request that moves a window, up to its values.
+
+    Append ``CONFIGURE_WINDOW_POSITION.pack(x, y)``, or with ``stack_mode``
+    ``CONFIGURE_WINDOW_POSITION_RAISE.pack(x, y, stack_mode_value)``, to
+    complete the request.
+
+    Args:
+        window: Window to move.
+        stack_mode: Whether the request also carries a stack mode.
+
+    Returns:
+        12-byte request prefix.
+    """
+    if stack_mode:
+        return _CONFIGURE_WINDOW_PREFIX.pack(
+            CONFIGURE_WINDOW_OPCODE, 6, window, _CW_X | _CW_Y | _CW_STACK_MODE
+        )
+    return _CONFIGURE_WINDOW_PREFIX.pack(CONFIGURE_WINDOW_OPCODE, 5, window, _CW_X | _CW_Y)
+
+
+def fakeInput_pack(
+    major_opcode: int, event_type: int, detail: int = 0, x: int = 0, y: int = 0
+) -> bytes:
+    """
+    Encode an XTEST FakeInput request (CurrentTime, root of the pointer screen).
+
+    Args:
+        major_opcode: XTEST major opcode for this connection.
+        event_type: X event type (KeyPress, ButtonPress, MotionNotify, ...).
+        detail: Keycode or button number; 0 for absolute motion.
+        x: Root X coordinate for motion.
+        y: Root Y coordinate for motion.
+
+    Returns:
+        36-byte request encoding.
+    """
+    return _FAKE_INPUT.pack(
+        major_opcode, XTEST_FAKE_INPUT_MINOR, 9, event_type, detail, 0, 0, x, y
+    )
+
+
+def request_queue(protocol_display: Any, binary: bytes) -> None:
+    """
+    Queue an encoded request on a python-xlib protocol display without flushing.
+
+    Args:
+        protocol_display: ``Display.display`` of a python-xlib Display.
+        binary: Complete request encoding.
+
+    Returns:
+        None.
+    """
+    protocol_display.send_request(RawRequest(binary), False)
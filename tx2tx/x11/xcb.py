@@ -0,0 +1,180 @@
+"""Optional libxcb fast path for high-frequency X11 pointer requests.
+
+python-xlib marshals every request in pure Python. When the optional
+``xcffib`` binding is installed, this module opens a companion libxcb
+connection to the same display so hot, fire-and-forget pointer requests are
+encoded in C instead.
+
+Only connection-agnostic requests are routed here: warps, XTest motion,
+pointer queries, and moves of windows addressed by id. Grabs and event
+draining stay on the python-xlib connection because X11 delivers grabbed
+input events to the grabbing client, and the input capturer reads them from
+that connection.
+
+Install with: pip install -e ".[xcb]"
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Optional
+
+from tx2tx.common.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import xcffib
+    import xcffib.xtest
+
+    XCB_AVAILABLE = True
+except ImportError:
+    xcffib = None
+    XCB_AVAILABLE = False
+
+# Core protocol constants (X.MotionNotify, X.CurrentTime, X.Above)
+_MOTION_NOTIFY: int = 6
+_CURRENT_TIME: int = 0
+_STACK_ABOVE: int = 0
+# ConfigureWindow value-mask bits (CWX, CWY, CWStackMode)
+_CONFIG_WINDOW_POSITION: int = 0x01 | 0x02
+_CONFIG_WINDOW_POSITION_STACK: int = _CONFIG_WINDOW_POSITION | 0x40
+
+
+class XcbPointerChannel:
+    """Companion libxcb connection for pointer requests."""
+
+    def __init__(self, connection: Any) -> None:
+        """
+        Initialize channel from an open xcffib connection.
+
+        Args:
+            connection: Connected ``xcffib.Connection``.
+        """
+        self._conn: Any = connection
+        setup: Any = connection.get_setup()
+        self._root: int = setup.roots[connection.pref_screen].root
+        self._xtest: Any = None
+        self._errors_due_ns: int = 0  # Next errors_poll() that reads the socket
+        try:
+            self._xtest = connection(xcffib.xtest.key)
+        except Exception as exc:
+            logger.debug("xcb XTEST unavailable: %r", exc)
+
+    @property
+    def has_xtest(self) -> bool:
+        """True when the XTEST extension handle is available."""
+        return self._xtest is not None
+
+    @classmethod
+    def channel_open(cls, display_name: Optional[str]) -> Optional["XcbPointerChannel"]:
+        """
+        Open a channel when xcffib is importable.
+
+        Args:
+            display_name: X11 display name, or None for ``$DISPLAY``.
+
+        Returns:
+            Open channel, or None when xcffib is unavailable or connect fails.
+        """
+        if not XCB_AVAILABLE:
+            return None
+        try:
+            return cls(xcffib.connect(display=display_name))
+        except Exception as exc:
+            logger.debug("xcb fast path unavailable: %r", exc)
+            return None
+
+    def pointer_warp(self, x: int, y: int) -> None:
+        """
+        Queue an absolute WarpPointer request on the root window.
+
+        Args:
+            x: Target root X coordinate.
+            y: Target root Y coordinate.
+        """
+        self._conn.core.WarpPointer(0, self._root, 0, 0, 0, 0, x, y)
+
+    def pointer_motionFake(self, x: int, y: int) -> None:
+        """
+        Queue an XTest absolute motion event on the root window.
+
+        Args:
+            x: Target root X coordinate.
+            y: Target root Y coordinate.
+        """
+        self._xtest.FakeInput(_MOTION_NOTIFY, 0, _CURRENT_TIME, self._root, x, y, 0)
+
+    def window_move(self, window: int, x: int, y: int, stack_above: bool = False) -> None:
+        """
+        Queue an unchecked ConfigureWindow moving a window.
+
+        Args:
+            window: Id of the window to move.
+            x: New window X coordinate.
+            y: New window Y coordinate.
+            stack_above: Also raise the window above its siblings.
+        """
+        # Values travel as CARD32 slots; the server reads the low 16 bits of
+        # each coordinate as INT16, so negatives are passed two's complement
+        if stack_above:
+            self._conn.core.ConfigureWindow(
+                window,
+                _CONFIG_WINDOW_POSITION_STACK,
+                [x & 0xFFFFFFFF, y & 0xFFFFFFFF, _STACK_ABOVE],
+            )
+            return
+        self._conn.core.ConfigureWindow(
+            window, _CONFIG_WINDOW_POSITION, [x & 0xFFFFFFFF, y & 0xFFFFFFFF]
+        )
+
+    def pointer_query(self) -> tuple[int, int]:
+        """
+        Query the pointer position (one round-trip on this connection).
+
+        Returns:
+            Root (x, y) coordinates.
+        """
+        reply: Any = self._conn.core.QueryPointer(self._root).reply()
+        return reply.root_x, reply.root_y
+
+    def flush(self) -> None:
+        """Send queued requests without waiting for a reply."""
+        self._conn.flush()
+
+    def errors_poll(self) -> int:
+        """
+        Log X errors returned for unchecked requests, at most once per interval.
+
+        Nothing selects events on this connection, so anything queued on it
+        is an error reply. Reading them also keeps them from piling up.
+
+        Returns:
+            Number of errors logged.
+        """
+        now_ns: int = time.monotonic_ns()
+        if now_ns < self._errors_due_ns:
+            return 0
+        self._errors_due_ns = now_ns + int(settings.XCB_ERROR_POLL_INTERVAL_SEC * 1e9)
+        count: int = 0
+        while True:
+            try:
+                event: Any = self._conn.poll_for_event()
+            except xcffib.ConnectionException as exc:
+                logger.warning("xcb connection failed: %r", exc)
+                return count
+            except Exception as exc:
+                # xcffib raises error replies instead of returning them
+                logger.warning("xcb request failed: %r", exc)
+                count += 1
+                continue
+            if event is None:
+                return count
+
+    def close(self) -> None:
+        """Disconnect the companion connection."""
+        try:
+            self._conn.disconnect()
+        except Exception:
+            pass